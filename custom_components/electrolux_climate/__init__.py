@@ -1,23 +1,148 @@
 """The Electrolux Control integration."""
 import base64
+import dataclasses
+import logging
+from functools import partial
 
-from homeassistant.core import HomeAssistant
+import broadlink
+import voluptuous as vol
+import homeassistant.helpers.config_validation as cv
+
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.typing import ConfigType
 from homeassistant.config_entries import ConfigEntry
 
-from homeassistant.const import CONF_HOST, CONF_TIMEOUT, CONF_NAME, CONF_MAC
+from homeassistant.const import CONF_HOST, CONF_TIMEOUT, CONF_NAME, CONF_MAC, EVENT_HOMEASSISTANT_STOP
 from homeassistant.components.climate.const import ATTR_MAX_TEMP, ATTR_MIN_TEMP
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.util import dt as dt_util
 
 from broadlink import DEFAULT_TIMEOUT
+from broadlink.exceptions import BroadlinkException
+
+from .capture import FrameRecorder, SUFFIX
+from .const import DOMAIN, PLATFORMS, DEFAULT_MIN, DEFAULT_MAX, CONF_SN, CONF_LAST_STATUS, CONF_SESSION, CONF_POLL_CONCURRENCY, CONF_PUSH, CONF_CAPTURE, DATA_SCHEDULER, DEFAULT_POLL_CONCURRENCY
+from .coordinator import ElectroluxCoordinator
+from .electrolux import ElectroluxStatus, DEVICE_TYPE
+from .scheduler import PollScheduler, async_get_scheduler
+from .services import async_setup_services
+from .session import async_get_registry
+
+_LOGGER = logging.getLogger(__name__)
 
-from .const import PLATFORMS, DEFAULT_MIN, DEFAULT_MAX
+CONFIG_SCHEMA = vol.Schema({
+    vol.Optional(DOMAIN): vol.Schema({
+        vol.Optional(CONF_POLL_CONCURRENCY, default=DEFAULT_POLL_CONCURRENCY): cv.positive_int,
+    }),
+}, extra=vol.ALLOW_EXTRA)
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    conf = config.get(DOMAIN, {})
+    hass.data[DATA_SCHEDULER] = PollScheduler(hass, conf.get(CONF_POLL_CONCURRENCY, DEFAULT_POLL_CONCURRENCY))
+    async_setup_services(hass)
+    return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    host = entry.data[CONF_HOST]
+    timeout = entry.data.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
+
+    if CONF_SN not in entry.data:
+        # First start for this entry, make sure the unit is there before
+        # looking up its serial number.
+        try:
+            device = await hass.async_add_executor_job(broadlink.hello, host, broadlink.DEFAULT_PORT, timeout)
+        except (BroadlinkException, OSError) as err:
+            raise ConfigEntryNotReady(f"Unable to discover unit at {host}: {err}") from err
+
+        if device.devtype != DEVICE_TYPE:
+            _LOGGER.error("Device at %s is not supported (type %s)", host, hex(device.devtype))
+            return False
+
+    session = async_get_registry(hass).async_get(
+        host,
+        bytes.fromhex(entry.data[CONF_MAC]),
+        entry.data[CONF_NAME],
+        timeout)
+
+    if entry.options.get(CONF_CAPTURE, False):
+        started = dt_util.now().strftime("%Y%m%d-%H%M%S")
+        path = hass.config.path(DOMAIN, f"{entry.data[CONF_MAC]}-{started}{SUFFIX}")
+        _LOGGER.info("Recording frames of %s to %s", entry.title, path)
+        entry.async_on_unload(session.async_enable_capture(FrameRecorder(hass, path, bytes.fromhex(entry.data[CONF_MAC]))))
+
+    if (saved := entry.data.get(CONF_SESSION)) is not None:
+        # Skip the auth handshake while the unit still accepts the old key.
+        session.async_restore_auth(saved["id"], bytes.fromhex(saved["key"]))
+
+    @callback
+    def _async_save_auth(dev_id: int, key: bytes) -> None:
+        hass.config_entries.async_update_entry(
+            entry, data={**entry.data, CONF_SESSION: {"id": dev_id, "key": key.hex()}})
+
+    session.auth_listener = _async_save_auth
+    entry.async_on_unload(partial(setattr, session, "auth_listener", None))
+
+    @callback
+    def _async_save_host(host: str) -> None:
+        hass.config_entries.async_update_entry(entry, data={**entry.data, CONF_HOST: host})
+
+    session.host_listener = _async_save_host
+    entry.async_on_unload(partial(setattr, session, "host_listener", None))
+
+    coordinator = ElectroluxCoordinator(hass, entry, session)
+    if CONF_SN in entry.data and CONF_LAST_STATUS in entry.data:
+        # Known unit, start from the status saved when it was last unloaded
+        # and let the scheduler's first poll connect in the background.
+        coordinator.async_restore(ElectroluxStatus.from_dict(entry.data[CONF_LAST_STATUS]))
+    else:
+        await coordinator.async_config_entry_first_refresh()
+
+    if CONF_SN not in entry.data:
+        sn = coordinator.data.sn
+        if sn is None:
+            sn = entry.data[CONF_MAC]
+            _LOGGER.warning("SN not available on %s, using MAC address", entry.title)
+        hass.config_entries.async_update_entry(entry, data={**entry.data, CONF_SN: sn})
+
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+    entry.async_on_unload(async_get_scheduler(hass).async_register(coordinator))
+    if entry.options.get(CONF_PUSH, False):
+        entry.async_on_unload(session.async_enable_push(coordinator.async_push))
+
+    @callback
+    def _async_save_status(event: Event = None) -> None:
+        if coordinator.data is not None and not coordinator.is_foreign(coordinator.data.sn):
+            hass.config_entries.async_update_entry(
+                entry, data={**entry.data, CONF_LAST_STATUS: dataclasses.asdict(coordinator.data)})
+
+    entry.async_on_unload(_async_save_status)
+    entry.async_on_unload(hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_save_status))
+
+    options = dict(entry.options)
+
+    async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+        # Entry data is also updated at runtime, only option changes need a reload.
+        if entry.options != options:
+            await hass.config_entries.async_reload(entry.entry_id)
+            return
+        # A new address, from DHCP discovery for one, is used in place.
+        try:
+            await session.async_set_host(entry.data[CONF_HOST])
+        except OSError as err:
+            _LOGGER.warning("Unable to resolve %s for %s: %s", entry.data[CONF_HOST], entry.title, err)
+
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     return True
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        hass.data[DOMAIN].pop(entry.entry_id)
+        async_get_registry(hass).async_release(bytes.fromhex(entry.data[CONF_MAC]))
+    return unload_ok
 
 # Example migration function
 async def async_migrate_entry(hass, config_entry: ConfigEntry):
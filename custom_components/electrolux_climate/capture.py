@@ -0,0 +1,94 @@
+"""Frame capture for the Electrolux Climate integration.
+
+A capture file holds the frames exchanged with one unit, for replaying
+with scripts/replay.py. It starts with a header carrying the unit's MAC
+and the wall clock time the capture started, followed by records of a
+monotonic offset in seconds, a kind and the length of the data.
+
+Captures contain the session keys needed to decrypt them, treat them
+like a password.
+"""
+import asyncio
+import os
+import struct
+import time
+import typing as t
+
+from homeassistant.core import HomeAssistant
+
+HEADER = struct.Struct("<8s6sd")
+MAGIC = b"ELXCAP\x00\x01"
+RECORD = struct.Struct("<dBH")
+KEY_RECORD = struct.Struct("<I16s")
+
+# Record kinds: frames sent and received, and the session key in use
+# for the frames that follow.
+TX = 0
+RX = 1
+KEY = 2
+
+SUFFIX = ".elxcap"
+
+
+class FrameRecorder:
+    """Buffers the frames of one unit and appends them to a capture file.
+
+    Records are only written to disk by async_flush, in the executor, so
+    recording a frame never blocks the event loop.
+    """
+
+    def __init__(self, hass: HomeAssistant, path: str, mac: bytes) -> None:
+        self.hass = hass
+        self.path = path
+        self.frames = 0
+        self._start = time.monotonic()
+        self._buffer = bytearray(HEADER.pack(MAGIC, mac, time.time()))
+        self._lock = asyncio.Lock()
+
+    def record(self, kind: int, data: t.Union[bytes, memoryview]) -> None:
+        self._buffer += RECORD.pack(time.monotonic() - self._start, kind, len(data))
+        self._buffer += data
+        self.frames += kind != KEY
+
+    def record_key(self, dev_id: int, key: bytes) -> None:
+        self.record(KEY, KEY_RECORD.pack(dev_id, key))
+
+    async def async_flush(self) -> None:
+        """Append the buffered records to the capture file."""
+        async with self._lock:
+            if not self._buffer:
+                return
+            data = bytes(self._buffer)
+            self._buffer.clear()
+            await self.hass.async_add_executor_job(self._write, data)
+
+    def _write(self, data: bytes) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "ab") as file:
+            file.write(data)
+
+
+def read_capture(path: str) -> t.Tuple[bytes, float, t.List[t.Tuple[float, int, bytes]]]:
+    """Return the MAC, start time and (offset, kind, data) records of a capture file.
+
+    A record cut short, as left by a crash during a write, ends the capture.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is not a capture file")
+    magic, mac, started = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a capture file")
+
+    records = []
+    offset = HEADER.size
+    while offset + RECORD.size <= len(data):
+        seconds, kind, length = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        if offset + length > len(data):
+            break
+        records.append((seconds, kind, data[offset:offset + length]))
+        offset += length
+    return mac, started, records
@@ -0,0 +1,173 @@
+"""Packet encoder and decoder for the Electrolux 0x6A protocol.
+
+Frames are built in and decrypted into buffers owned by the codec, so a
+request or response costs no intermediate copies. Views returned by a
+codec are only valid until the next call of the same kind on it.
+"""
+import struct
+import typing as t
+
+import broadlink.exceptions as e
+
+from broadlink.protocol import Datetime
+
+from cryptography.hazmat.primitives.ciphers import Cipher
+
+# Outer broadlink frame: magic, checksum, error, devtype, packet type,
+# counter, MAC (reversed), device id and payload checksum.
+FRAME_HEADER = struct.Struct("<8s24xHhHHH6sIH2x")
+FRAME_MAGIC = bytes.fromhex("5aa5aa555aa5aa55")
+FRAME_CHECKSUM = struct.Struct("<H")
+FRAME_ERROR = struct.Struct("<h")
+FRAME_COUNT = struct.Struct("<H")
+FRAME_TYPE = struct.Struct("<H")
+
+# Packet type of command replies, and the command of status reads.
+COMMAND_REPLY = 0x3EE
+STATUS_COMMAND = 0x0e
+
+# Inner command header: command, magic, checksum, flags, length.
+COMMAND_HEADER = struct.Struct("<H4sHBBH2x")
+COMMAND_MAGIC = bytes.fromhex("a5a55a5a")
+
+# Unencrypted broadlink ping, feeds the unit's watchdog and needs no reply.
+PING_FRAME = bytes(0x26) + b"\x01" + bytes(0x09)
+
+# Hello replies carry the device type, MAC (reversed), name and lock flag.
+HELLO_SIZE = 0x80
+
+BLOCK_SIZE = 16
+ZERO_BLOCK = memoryview(bytes(BLOCK_SIZE))
+MAX_PACKET = 2048
+
+
+class PacketCodec:
+    """Builds and parses frames for one unit using preallocated buffers."""
+
+    __slots__ = ("_command", "_command_view", "_tx", "_tx_view", "_rx", "_rx_view")
+
+    def __init__(self, size: int = MAX_PACKET) -> None:
+        # Room for a full frame plus the extra block update_into asks for.
+        self._command = bytearray(size)
+        self._command_view = memoryview(self._command)
+        self._tx = bytearray(FRAME_HEADER.size + size + BLOCK_SIZE)
+        self._tx_view = memoryview(self._tx)
+        self._rx = bytearray(size + BLOCK_SIZE)
+        self._rx_view = memoryview(self._rx)
+
+    def pack_command(self, command: int, data: bytes = b"") -> memoryview:
+        """Build the 0x6A command payload for data, padded to the AES block size."""
+        length = len(data)
+        end = COMMAND_HEADER.size + length
+        padded = -(-end // BLOCK_SIZE) * BLOCK_SIZE
+        buf = self._command
+
+        COMMAND_HEADER.pack_into(buf, 0, command, COMMAND_MAGIC, 0, 0x01 if length <= 2 else 0x02, 0x0b, length)
+        buf[COMMAND_HEADER.size:end] = data
+        buf[end:padded] = ZERO_BLOCK[:padded - end]
+
+        checksum = sum(self._command_view[0x08:end], 0xC0AD) & 0xFFFF
+        FRAME_CHECKSUM.pack_into(buf, 0x06, checksum)
+        return self._command_view[:padded]
+
+    def pack_frame(self, packet_type: int, payload: memoryview, devtype: int, count: int, mac: bytes, dev_id: int, cipher: Cipher) -> memoryview:
+        """Encrypt payload and wrap it in the broadlink header."""
+        padded = -(-len(payload) // BLOCK_SIZE) * BLOCK_SIZE
+        if padded != len(payload):
+            payload = bytes(payload) + bytes(padded - len(payload))
+
+        buf = self._tx
+        FRAME_HEADER.pack_into(
+            buf, 0, FRAME_MAGIC, 0, 0, devtype, packet_type, count, mac[::-1], dev_id, sum(payload, 0xBEAF) & 0xFFFF)
+
+        end = FRAME_HEADER.size + padded
+        encryptor = cipher.encryptor()
+        encryptor.update_into(payload, self._tx_view[FRAME_HEADER.size:end + BLOCK_SIZE - 1])
+        encryptor.finalize()
+
+        FRAME_CHECKSUM.pack_into(buf, 0x20, sum(self._tx_view[:end], 0xBEAF) & 0xFFFF)
+        return self._tx_view[:end]
+
+    @staticmethod
+    def check_frame(frame: bytes) -> None:
+        """Validate the length, checksum and error code of a received frame."""
+        if len(frame) < 0x30:
+            raise e.DataValidationError(
+                -4007,
+                "Received data packet length error",
+                f"Expected at least 48 bytes and received {len(frame)}",
+            )
+
+        nom_checksum = FRAME_CHECKSUM.unpack_from(frame, 0x20)[0]
+        real_checksum = (sum(frame, 0xBEAF) - frame[0x20] - frame[0x21]) & 0xFFFF
+
+        if nom_checksum != real_checksum:
+            raise e.DataValidationError(
+                -4008,
+                "Received data packet check error",
+                f"Expected a checksum of {nom_checksum} and received {real_checksum}",
+            )
+
+        error = FRAME_ERROR.unpack_from(frame, 0x22)[0]
+        if error:
+            raise e.exception(error)
+
+    def decrypt_frame(self, frame: bytes, cipher: Cipher) -> memoryview:
+        """Decrypt the payload of a received frame."""
+        body = memoryview(frame)[FRAME_HEADER.size:]
+        length = len(body)
+        if not length or length % BLOCK_SIZE or length > len(self._rx) - BLOCK_SIZE:
+            raise e.DataValidationError(
+                -4010,
+                "Received encrypted data packet length error",
+                f"Unexpected payload length {length}",
+            )
+
+        decryptor = cipher.decryptor()
+        decryptor.update_into(body, self._rx_view[:length + BLOCK_SIZE - 1])
+        decryptor.finalize()
+        return self._rx_view[:length]
+
+    @staticmethod
+    def unpack_command(body: memoryview) -> memoryview:
+        """Check a decrypted 0x6A payload and return a view of its JSON."""
+        _, _, checksum, _, _, length = COMMAND_HEADER.unpack_from(body, 0)
+
+        if sum(body[0x08:], 0xC0AD) & 0xFFFF != checksum:
+            raise e.DataValidationError(-4008, "Received data packet check error", "Failed to validate JSON checksum.")
+
+        return body[COMMAND_HEADER.size:COMMAND_HEADER.size + length]
+
+
+def frame_count(frame: bytes) -> int:
+    """Return the packet counter of a frame."""
+    return FRAME_COUNT.unpack_from(frame, 0x28)[0]
+
+
+def frame_type(frame: bytes) -> int:
+    """Return the packet type of a frame."""
+    return FRAME_TYPE.unpack_from(frame, 0x26)[0]
+
+
+def command_id(body: memoryview) -> int:
+    """Return the command of a decrypted 0x6A payload."""
+    return COMMAND_HEADER.unpack_from(body, 0)[0]
+
+
+def pack_hello() -> bytes:
+    """Return a broadlink hello, answered by every unit it reaches."""
+    packet = bytearray(0x30)
+    packet[0x08:0x14] = Datetime.pack(Datetime.now())
+    packet[0x26] = 0x06
+    FRAME_CHECKSUM.pack_into(packet, 0x20, sum(packet, 0xBEAF) & 0xFFFF)
+    return bytes(packet)
+
+
+def unpack_hello(frame: bytes) -> t.Tuple[int, bytes, str, bool]:
+    """Return devtype, MAC, name and lock flag of a hello reply."""
+    if len(frame) < HELLO_SIZE:
+        raise e.DataValidationError(-4007, "Received data packet length error", f"Hello reply is {len(frame)} bytes")
+    devtype = struct.unpack_from("<H", frame, 0x34)[0]
+    mac = frame[0x3A:0x40][::-1]
+    name = frame[0x40:0x7F].split(b"\x00")[0].decode("utf-8", "replace")
+    return devtype, bytes(mac), name, bool(frame[0x7F])
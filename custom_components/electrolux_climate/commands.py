@@ -0,0 +1,150 @@
+"""Command building and batching for the Electrolux Climate integration."""
+import asyncio
+import json
+import logging
+import typing as t
+
+from homeassistant.core import HomeAssistant, callback
+
+from .electrolux import electrolux, MIN_TEMP, MAX_TEMP
+
+_LOGGER = logging.getLogger(__name__)
+
+# Command code each writable status key is sent with.
+COMMAND_CODES = {
+    "temp": 0x17,
+    "ac_pwr": 0x18,
+    "ac_slp": 0x18,
+    "mldprf": 0x18,
+    "ac_mode": 0x19,
+    "ac_mark": 0x19,
+    "ac_vdir": 0x19,
+    "scrdisp": 0x19,
+    "timer": 0x1f,
+    "on_timer": 0x1f,
+    "off_timer": 0x1f,
+}
+
+# Both timers are reported as "timer". They are queued under keys of their
+# own, so setting one does not replace the other within a window, and each
+# is sent alone under the status key.
+TIMER_KEYS = {"on_timer": "timer", "off_timer": "timer"}
+
+# Power has to be sent before the mode and setpoint it applies to.
+COMMAND_ORDER = (0x18, 0x19, 0x17, 0x1f)
+
+
+def temp(temp: int) -> dict:
+    return {"temp": max(MIN_TEMP, min(temp, MAX_TEMP))}
+
+def power(power_on: bool) -> dict:
+    return {"ac_pwr": 1 if power_on else 0}
+
+def mode(mode: electrolux.mode) -> dict:
+    return {"ac_mode": mode.value}
+
+def fan(fan: electrolux.fan) -> dict:
+    return {"ac_mark": fan.value}
+
+def swing(swing_on: bool) -> dict:
+    return {"ac_vdir": 1 if swing_on else 0}
+
+def led(led_on: bool) -> dict:
+    return {"scrdisp": 1 if led_on else 0}
+
+def sleep(sleep_on: bool) -> dict:
+    return {"ac_slp": 1 if sleep_on else 0}
+
+def self_clean(clean_on: bool) -> dict:
+    return {"mldprf": 1 if clean_on else 0}
+
+def timer(on_timer: bool, hours: int, minutes: int) -> dict:
+    hours = max(0, min(hours, 23))
+    minutes = max(0, min(minutes, 59))
+    return {"on_timer" if on_timer else "off_timer": "%02d%02d|0%s" % (hours, minutes, 1 if on_timer else 0)}
+
+def timer_minutes(timer: t.Optional[str], on_timer: bool) -> int:
+    """Return the minutes left on the on or off timer in a reported timer value."""
+    if not timer or len(timer) < 7 or timer[6] != ("1" if on_timer else "0"):
+        return 0
+    try:
+        return int(timer[0:2]) * 60 + int(timer[2:4])
+    except ValueError:
+        return 0
+
+
+def status_values(values: dict) -> dict:
+    """Return written values keyed by the status field they set."""
+    return {TIMER_KEYS.get(key, key): value for key, value in values.items()}
+
+
+def build_packets(values: dict) -> list[tuple[int, bytes]]:
+    """Group values by command code into (command, JSON payload) pairs, in send order."""
+    groups: dict[int, dict] = {}
+    alone: list[tuple[int, dict]] = []
+    for key, value in values.items():
+        if key in TIMER_KEYS:
+            alone.append((COMMAND_CODES[key], {TIMER_KEYS[key]: value}))
+        else:
+            groups.setdefault(COMMAND_CODES[key], {})[key] = value
+
+    # The sort is stable, grouped values go before timers of the same command.
+    payloads = sorted([*groups.items(), *alone], key=lambda item: COMMAND_ORDER.index(item[0]))
+    return [(command, json.dumps(payload, separators=(",", ":")).encode("ascii")) for command, payload in payloads]
+
+
+class CommandBatcher:
+    """Merges writes issued within a short window into as few packets as possible.
+
+    Writes to the same key within the window collapse to the last value, the
+    rest are grouped by command code and sent in one go through the session.
+    """
+
+    def __init__(self, hass: HomeAssistant, send: t.Callable[[list], t.Awaitable[str]], window: float) -> None:
+        self.hass = hass
+        self._send = send
+        self._window = window
+        self._pending: dict = {}
+        self._waiters: list[asyncio.Future] = []
+        self._flush_handle: t.Optional[asyncio.TimerHandle] = None
+
+    @callback
+    def async_write(self, values: dict) -> asyncio.Future:
+        """Queue values for the next flush, the future resolves with the device reply."""
+        self._pending.update(values)
+        future = self.hass.loop.create_future()
+        self._waiters.append(future)
+
+        if self._flush_handle is None:
+            self._flush_handle = self.hass.loop.call_later(self._window, self._async_flush)
+        return future
+
+    @callback
+    def _async_flush(self) -> None:
+        self._flush_handle = None
+        values, self._pending = self._pending, {}
+        waiters, self._waiters = self._waiters, []
+        self.hass.async_create_task(self._async_send(values, waiters))
+
+    async def _async_send(self, values: dict, waiters: list[asyncio.Future]) -> None:
+        _LOGGER.debug("Sending %s", values)
+        try:
+            resp = await self._send(build_packets(values))
+        except Exception as err:  # pylint: disable=broad-except
+            for future in waiters:
+                if not future.done():
+                    future.set_exception(err)
+            return
+
+        for future in waiters:
+            if not future.done():
+                future.set_result(resp)
+
+    @callback
+    def async_cancel(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for future in self._waiters:
+            future.cancel()
+        self._pending, self._waiters = {}, []
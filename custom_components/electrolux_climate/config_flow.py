@@ -1,6 +1,7 @@
 """Config flow for Electrolux Climate."""
 from pickle import NONE
 import broadlink
+import dataclasses
 import base64
 import json
 import errno
@@ -11,7 +12,8 @@ import homeassistant.helpers.config_validation as cv
 
 from homeassistant import data_entry_flow
 from homeassistant.components import dhcp
-from homeassistant.config_entries import ConfigFlow
+from homeassistant.config_entries import ConfigEntry, ConfigFlow, OptionsFlow
+from homeassistant.core import callback
 from homeassistant import config_entries
 
 from broadlink.exceptions import (
@@ -19,7 +21,8 @@ from broadlink.exceptions import (
 )
 
 from .electrolux import DEVICE_TYPE
-from .const import DOMAIN, DEFAULT_MIN, DEFAULT_MAX
+from .discovery import async_resolve_targets, async_sweep, async_read_units
+from .const import DOMAIN, DEFAULT_MIN, DEFAULT_MAX, CONF_PUSH, CONF_CAPTURE, CONF_SN, CONF_LAST_STATUS, CONF_SESSION, CONF_TARGETS, CONF_UNITS, DISCOVERY_TIMEOUT
 from homeassistant.const import CONF_HOST, CONF_TIMEOUT, CONF_NAME, CONF_MAC
 from homeassistant.components.climate.const import ATTR_MAX_TEMP, ATTR_MIN_TEMP
 
@@ -29,6 +32,12 @@ class ElectroluxClimateConfigFlow(ConfigFlow, domain=DOMAIN):
 
     def __init__(self):
         self.device = None
+        self.discovered = {}
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        return ElectroluxClimateOptionsFlow(config_entry)
 
     async def async_set_device(self, device, raise_on_progress=True):
         """Define a device for the config flow."""
@@ -53,7 +62,8 @@ class ElectroluxClimateConfigFlow(ConfigFlow, domain=DOMAIN):
         host = discovery_info.ip
         unique_id = discovery_info.macaddress.lower().replace(":", "")
         await self.async_set_unique_id(unique_id)
-        self._abort_if_unique_id_configured(updates={CONF_HOST: host})
+        # The running entry moves to the new address without a reload.
+        self._abort_if_unique_id_configured(updates={CONF_HOST: host}, reload_on_update=False)
 
         try:
             device = await self.hass.async_add_executor_job(broadlink.hello, host)
@@ -74,6 +84,12 @@ class ElectroluxClimateConfigFlow(ConfigFlow, domain=DOMAIN):
     
     async def async_step_user(self, user_input=None):
         """Handle a flow initiated by the user."""
+        if user_input is None and self.source == config_entries.SOURCE_USER:
+            return self.async_show_menu(step_id="user", menu_options=["host", "bulk"])
+        return await self.async_step_host(user_input)
+
+    async def async_step_host(self, user_input=None):
+        """Set up one unit by its address."""
         errors = {}
 
         if user_input is not None:
@@ -118,10 +134,101 @@ class ElectroluxClimateConfigFlow(ConfigFlow, domain=DOMAIN):
             vol.Required(CONF_HOST): str
         }
         return self.async_show_form(
-            step_id="user",
+            step_id="host",
+            data_schema=vol.Schema(data_schema),
+            errors=errors,
+        )
+
+    async def async_step_bulk(self, user_input=None):
+        """Sweep networks and hosts for units, all at once."""
+        errors = {}
+
+        if user_input is not None:
+            timeout = user_input[CONF_TIMEOUT]
+            try:
+                addresses = await async_resolve_targets(self.hass, user_input[CONF_TARGETS])
+            except ValueError:
+                errors[CONF_TARGETS] = "invalid_host"
+            else:
+                configured = self._async_current_ids()
+                units = [unit for unit in await async_sweep(addresses, timeout) if unit.mac.hex() not in configured]
+                if units:
+                    units = await async_read_units(self.hass, units, timeout)
+                    self.discovered = {unit.mac.hex(): unit for unit in units}
+                    return await self.async_step_bulk_confirm()
+                errors["base"] = "no_devices_found"
+
+        data_schema = {
+            vol.Required(CONF_TARGETS): str,
+            vol.Optional(CONF_TIMEOUT, default=DISCOVERY_TIMEOUT): cv.positive_int
+        }
+        return self.async_show_form(
+            step_id="bulk",
+            data_schema=vol.Schema(data_schema),
+            errors=errors,
+        )
+
+    async def async_step_bulk_confirm(self, user_input=None):
+        """Pick the discovered units to add and create their entries."""
+        errors = {}
+
+        if user_input is not None and not user_input[CONF_UNITS]:
+            errors["base"] = "no_units_selected"
+        elif user_input is not None:
+            entries = [self._bulk_entry(self.discovered[mac], user_input) for mac in user_input[CONF_UNITS]]
+            # A flow creates one entry, every other unit gets a flow of its own.
+            for entry in entries[1:]:
+                self.hass.async_create_task(
+                    self.hass.config_entries.flow.async_init(
+                        DOMAIN,
+                        context={"source": config_entries.SOURCE_INTEGRATION_DISCOVERY},
+                        data=entry,
+                    )
+                )
+            return await self.async_step_integration_discovery(entries[0])
+
+        units = {
+            mac: f"{unit.name} ({unit.host}, {unit.sn or ('locked' if unit.is_locked else 'no status')})"
+            for mac, unit in self.discovered.items()
+        }
+        data_schema = {
+            vol.Required(CONF_UNITS, default=list(units)): cv.multi_select(units),
+            vol.Optional(ATTR_MIN_TEMP, default=DEFAULT_MIN): cv.positive_int,
+            vol.Optional(ATTR_MAX_TEMP, default=DEFAULT_MAX): cv.positive_int
+        }
+        return self.async_show_form(
+            step_id="bulk_confirm",
             data_schema=vol.Schema(data_schema),
             errors=errors,
+            description_placeholders={"count": str(len(units))},
         )
+
+    def _bulk_entry(self, unit, user_input):
+        """Return the title and data of the entry for a discovered unit."""
+        names = [other.name for other in self.discovered.values()]
+        data = {
+            CONF_NAME: unit.name,
+            CONF_HOST: unit.host,
+            CONF_MAC: unit.mac.hex(),
+            CONF_TIMEOUT: broadlink.DEFAULT_TIMEOUT,
+            ATTR_MIN_TEMP: user_input[ATTR_MIN_TEMP],
+            ATTR_MAX_TEMP: user_input[ATTR_MAX_TEMP]
+        }
+        # With the serial number known the entry starts without another hello,
+        # and from the status and session key of the sweep's read.
+        if unit.sn is not None:
+            data[CONF_SN] = unit.sn
+            data[CONF_LAST_STATUS] = dataclasses.asdict(unit.status)
+            data[CONF_SESSION] = {"id": unit.auth[0], "key": unit.auth[1].hex()}
+        title = unit.name if names.count(unit.name) == 1 else f"{unit.name} ({unit.host})"
+        return {"title": title, "data": data}
+
+    async def async_step_integration_discovery(self, discovery_info):
+        """Create the entry for a unit picked in a bulk discovery."""
+        data = discovery_info["data"]
+        await self.async_set_unique_id(data[CONF_MAC])
+        self._abort_if_unique_id_configured(updates={CONF_HOST: data[CONF_HOST]})
+        return self.async_create_entry(title=discovery_info["title"], data=data)
     
     async def async_step_finish(self, user_input=None):
         """Choose a name for the device and create config entry."""
@@ -154,4 +261,22 @@ class ElectroluxClimateConfigFlow(ConfigFlow, domain=DOMAIN):
 
         return self.async_show_form(
             step_id="finish", data_schema=vol.Schema(data_schema), errors=errors
-        )
\ No newline at end of file
+        )
+
+
+class ElectroluxClimateOptionsFlow(OptionsFlow):
+
+    def __init__(self, config_entry: ConfigEntry):
+        self.config_entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        """Manage the options of a unit."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        data_schema = {
+            vol.Optional(CONF_PUSH, default=self.config_entry.options.get(CONF_PUSH, False)): bool,
+            vol.Optional(CONF_CAPTURE, default=self.config_entry.options.get(CONF_CAPTURE, False)): bool
+        }
+
+        return self.async_show_form(step_id="init", data_schema=vol.Schema(data_schema))
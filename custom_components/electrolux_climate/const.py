@@ -5,6 +5,19 @@ from homeassistant.const import Platform
 
 DOMAIN = "electrolux_climate"
 
+DATA_SESSIONS = f"{DOMAIN}_sessions"
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+DATA_TRANSPORT = f"{DOMAIN}_transport"
+
+CONF_SN = "sn"
+CONF_LAST_STATUS = "last_status"
+CONF_SESSION = "session"
+CONF_POLL_CONCURRENCY = "poll_concurrency"
+CONF_PUSH = "push"
+CONF_CAPTURE = "capture"
+CONF_TARGETS = "targets"
+CONF_UNITS = "units"
+
 FAN_QUIET = "quiet"
 FAN_TURBO = "turbo"
 
@@ -13,5 +26,55 @@ DEFAULT_MIN = 17
 MAX_TEMP = 40
 DEFAULT_MAX = 30
 
-PLATFORMS: list[Platform] = [Platform.CLIMATE, Platform.SWITCH]
-SCAN_INTERVAL = timedelta(seconds=5)
\ No newline at end of file
+PLATFORMS: list[Platform] = [Platform.CLIMATE, Platform.NUMBER, Platform.SENSOR, Platform.SWITCH]
+SCAN_INTERVAL = timedelta(seconds=5)
+
+# Adaptive polling: units back off towards these intervals while nothing
+# changes, and return to SCAN_INTERVAL for COMMAND_BOOST after a command.
+STABLE_SCAN_INTERVAL = timedelta(seconds=30)
+IDLE_SCAN_INTERVAL = timedelta(seconds=60)
+COMMAND_BOOST = timedelta(seconds=30)
+
+# Units polled at the same time, and the share of the scan interval their
+# start is spread over.
+DEFAULT_POLL_CONCURRENCY = 10
+POLL_JITTER = 0.5
+
+# Bulk discovery: seconds to wait for hello replies, and the largest
+# number of addresses one sweep may cover.
+DISCOVERY_TIMEOUT = 3
+MAX_DISCOVERY_HOSTS = 1024
+
+# group_set: units written at once, and the longest gap between power-ons.
+GROUP_CONCURRENCY = 50
+MAX_STAGGER = 10.0
+
+# Writes issued within this many seconds are merged into one batch.
+COMMAND_WINDOW = 0.1
+# Every send waits RETRY_TIMEOUT for a reply, growing by RETRY_BACKOFF up to
+# RETRY_MAX_TIMEOUT, before the frame is sent again.
+RETRY_ATTEMPTS = 4
+WRITE_ATTEMPTS = 3
+RETRY_TIMEOUT = 0.5
+RETRY_BACKOFF = 2.0
+RETRY_MAX_TIMEOUT = 3.0
+RETRY_JITTER = 0.2
+
+# Consecutive unanswered calls before a unit is left alone, and how long
+# to wait before probing it again.
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 30.0
+
+# Units that stop answering are looked for by MAC on the /RELOCATE_PREFIX
+# network of their last address, at most once every RELOCATE_COOLDOWN.
+RELOCATE_PREFIX = 24
+RELOCATE_TIMEOUT = 3
+RELOCATE_COOLDOWN = 60.0
+
+# Push mode: keepalives let the unit send status changes on its own, full
+# polls then only run every PUSH_SCAN_INTERVAL as a safety net.
+KEEPALIVE_INTERVAL = timedelta(seconds=20)
+PUSH_SCAN_INTERVAL = timedelta(minutes=2)
+
+# Frame capture: buffered records are written out this often.
+CAPTURE_FLUSH_INTERVAL = timedelta(seconds=10)
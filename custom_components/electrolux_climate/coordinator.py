@@ -0,0 +1,180 @@
+"""Status coordinator for the Electrolux Climate integration."""
+import asyncio
+import json
+import logging
+import typing as t
+from datetime import timedelta
+from functools import partial
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from broadlink.exceptions import BroadlinkException
+
+from .commands import status_values
+from .electrolux import ElectroluxStatus, STATUS_FIELDS
+from .session import ElectroluxSession
+from .const import CONF_SN, SCAN_INTERVAL, STABLE_SCAN_INTERVAL, IDLE_SCAN_INTERVAL, COMMAND_BOOST, PUSH_SCAN_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ElectroluxCoordinator(DataUpdateCoordinator[ElectroluxStatus]):
+    """Polls one unit and shares the parsed status with every entity of the entry.
+
+    The status doubles as a write-through cache: acknowledged writes are
+    applied to it straight away, and the next poll checks the unit agrees.
+    Listeners are only called when the status changed, changed_fields
+    tells them which fields did.
+
+    With push enabled, status the unit sends on its own is applied as it
+    arrives and polls slow down to PUSH_SCAN_INTERVAL. A poll that finds
+    a change no push reported means the unit does not push reliably, and
+    adaptive polling takes over again until the next push.
+
+    A status from another unit means this one got a new address, the
+    session then looks for it and the poll reads it at its new address.
+    Status from another unit is never cached, so it is never saved either.
+
+    A coordinator can start from a restored status instead of a first
+    poll, entities then report an assumed state until the unit answers.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, session: ElectroluxSession) -> None:
+        # Polls are driven by the integration wide PollScheduler.
+        super().__init__(hass, _LOGGER, name=entry.title, update_interval=None, always_update=False)
+        self.entry = entry
+        self.session = session
+        self.poll_interval = SCAN_INTERVAL
+        self._last_command: t.Optional[float] = None
+        self._unconfirmed: dict = {}
+        self._unconfirmed_since = 0.0
+        self.changed_fields: t.FrozenSet[str] = frozenset()
+        self.push_active = False
+        self.restored = False
+
+    async def _async_update_data(self) -> ElectroluxStatus:
+        started = self.hass.loop.time()
+        try:
+            state = await self.session.async_get_status()
+            if self.is_foreign(state.sn) and await self.session.async_relocate():
+                # Another unit took over the address, this one was found elsewhere.
+                state = await self.session.async_get_status()
+            self.session.metrics.polls.record(self.hass.loop.time() - started)
+        except (BroadlinkException, OSError, ValueError) as err:
+            self.poll_interval = SCAN_INTERVAL
+            self.changed_fields = frozenset()
+            raise UpdateFailed(f"Failed to fetch status: {err}") from err
+
+        if self.is_foreign(state.sn):
+            # Never cache, or later save, the status of another unit.
+            self.poll_interval = SCAN_INTERVAL
+            self.changed_fields = frozenset()
+            raise UpdateFailed(f"Unit at {self.session.device.host[0]} reports SN {state.sn}")
+
+        if self._unconfirmed and started >= self._unconfirmed_since:
+            self._reconcile(state)
+        restored = self.restored
+        self.changed_fields = self._changed(state)
+        if restored and state == self.data:
+            # A refresh only calls listeners for new data, they still
+            # have to drop the assumed state.
+            self.async_update_listeners()
+        if self.push_active and self.changed_fields:
+            _LOGGER.debug("%s changed %s without a push, polling again", self.name, ", ".join(sorted(self.changed_fields)))
+            self.push_active = False
+        self.poll_interval = self._next_poll_interval(state)
+        return state
+
+    def is_foreign(self, sn: t.Optional[str]) -> bool:
+        """Return True if sn belongs to another unit than the entry's."""
+        return sn is not None and CONF_SN in self.entry.data and sn != self.entry.data[CONF_SN]
+
+    def _changed(self, state: ElectroluxStatus) -> t.FrozenSet[str]:
+        """Return the fields state changes, all of them for the first live status."""
+        if self.restored:
+            self.restored = False
+            return STATUS_FIELDS
+        return state.diff(self.data)
+
+    def _reconcile(self, state: ElectroluxStatus) -> None:
+        """Compare written values against what the unit reports now."""
+        for key, value in self._unconfirmed.items():
+            if getattr(state, key) != value:
+                _LOGGER.warning("%s reports %s=%s after it acknowledged %s", self.name, key, getattr(state, key), value)
+        self._unconfirmed = {}
+
+    def _next_poll_interval(self, new: ElectroluxStatus) -> timedelta:
+        """Poll quickly around commands and changes, back off while the unit is steady."""
+        if self.push_active:
+            return PUSH_SCAN_INTERVAL
+
+        if self._last_command is not None and self.hass.loop.time() - self._last_command < COMMAND_BOOST.total_seconds():
+            return SCAN_INTERVAL
+
+        if self.changed_fields:
+            return SCAN_INTERVAL
+
+        limit = IDLE_SCAN_INTERVAL if new.ac_pwr == 0 else STABLE_SCAN_INTERVAL
+        return min(self.poll_interval * 2, limit)
+
+    @callback
+    def async_restore(self, state: ElectroluxStatus) -> None:
+        """Start from a status saved earlier, until the first poll replaces it."""
+        self.restored = True
+        self.data = state
+
+    @callback
+    def async_push(self, values: dict) -> None:
+        """Apply status values the unit pushed on top of the cached status."""
+        if self.is_foreign(values.get("sn")):
+            _LOGGER.debug("%s ignoring a push from SN %s", self.name, values.get("sn"))
+            return
+        state = (self.data or ElectroluxStatus()).merge(values)
+        if not self.push_active:
+            _LOGGER.debug("%s pushes status changes, slowing polls down", self.name)
+            self.push_active = True
+            self.poll_interval = PUSH_SCAN_INTERVAL
+
+        self.changed_fields = self._changed(state)
+        if self.changed_fields:
+            self.async_set_updated_data(state)
+
+    @callback
+    def async_write(self, values: dict) -> asyncio.Future:
+        """Queue a write to the unit and apply it to the cached status once acknowledged."""
+        self._last_command = self.hass.loop.time()
+        self.poll_interval = SCAN_INTERVAL
+        future = self.session.async_write(values)
+        future.add_done_callback(partial(self._async_write_done, values))
+        return future
+
+    @callback
+    def _async_write_done(self, values: dict, future: asyncio.Future) -> None:
+        if future.cancelled():
+            return
+        if (err := future.exception()) is not None:
+            _LOGGER.error("Failed to send command to %s: %s", self.name, err)
+            self.hass.async_create_task(self.async_request_refresh())
+            return
+
+        try:
+            reply = json.loads(future.result())
+        except ValueError:
+            reply = None
+        if isinstance(reply, dict) and self.is_foreign(reply.get("sn")):
+            _LOGGER.warning("%s: write answered by SN %s, polling to find the unit", self.name, reply.get("sn"))
+            self.hass.async_create_task(self.async_request_refresh())
+            return
+
+        values = status_values(values)
+        state = (self.data or ElectroluxStatus()).merge(values)
+        if isinstance(reply, dict):
+            # Units answer writes with their status, trust it over our guess.
+            state = state.merge(reply)
+
+        self._unconfirmed.update(values)
+        self._unconfirmed_since = self.hass.loop.time()
+        self.changed_fields = self._changed(state)
+        self.async_set_updated_data(state)
@@ -0,0 +1,45 @@
+"""Diagnostics support for the Electrolux Climate integration."""
+import dataclasses
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST, CONF_MAC
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_SN, CONF_SESSION
+from .coordinator import ElectroluxCoordinator
+from .scheduler import async_get_scheduler
+
+TO_REDACT = {CONF_HOST, CONF_MAC, CONF_SN, CONF_SESSION}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Return diagnostics for a config entry."""
+    coordinator: ElectroluxCoordinator = hass.data[DOMAIN][entry.entry_id]
+    session = coordinator.session
+    scheduler = async_get_scheduler(hass)
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "status": async_redact_data(dataclasses.asdict(coordinator.data), TO_REDACT) if coordinator.data else None,
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "poll_interval": coordinator.poll_interval.total_seconds(),
+        },
+        "session": {
+            "authenticated": session.authenticated,
+            "queue_depth": session.queue_depth,
+            "max_queue_depth": session.max_queue_depth,
+            "merged_reads": session.merged_reads,
+            "breaker_open": session.breaker.is_open,
+            "breaker_failures": session.breaker.failures,
+        },
+        "metrics": session.metrics.as_dict(),
+        "scheduler": {
+            "concurrency": scheduler.concurrency,
+            "cycles": scheduler.cycles,
+            "overruns": scheduler.overruns,
+            "last_cycle_duration": scheduler.last_cycle_duration,
+            "cycle_durations": scheduler.cycle_durations.as_dict(),
+        },
+    }
@@ -0,0 +1,126 @@
+"""Bulk discovery of units for the Electrolux Climate integration."""
+import asyncio
+import ipaddress
+import logging
+import socket
+import typing as t
+
+from dataclasses import dataclass
+
+from homeassistant.core import HomeAssistant
+
+from broadlink import DEFAULT_PORT
+from broadlink.exceptions import BroadlinkException
+
+from .electrolux import electrolux, ElectroluxStatus, DEVICE_TYPE
+from .retry import RetryPolicy
+from .session import ElectroluxSession
+from .transport import async_create_protocol, async_hello
+from .const import MAX_DISCOVERY_HOSTS, DEFAULT_POLL_CONCURRENCY
+
+_LOGGER = logging.getLogger(__name__)
+
+# Units that answered the hello have proven they are there, one read with
+# a short retry is enough to tell a working unit from a broken one.
+DISCOVERY_RETRY = RetryPolicy(attempts=3)
+
+
+@dataclass(frozen=True)
+class DiscoveredUnit:
+    """A unit that answered the sweep, with its status if it could be read.
+
+    auth holds the device id and session key the read authenticated with.
+    """
+
+    host: str
+    mac: bytes
+    name: str
+    is_locked: bool
+    status: t.Optional[ElectroluxStatus] = None
+    auth: t.Optional[t.Tuple[int, bytes]] = None
+
+    @property
+    def sn(self) -> t.Optional[str]:
+        return self.status.sn if self.status is not None else None
+
+
+async def async_resolve_targets(hass: HomeAssistant, targets: str) -> t.List[str]:
+    """Turn networks, addresses and hostnames into the addresses to sweep.
+
+    Networks are expanded to their hosts plus their broadcast address, so
+    units are found even where broadcasts are filtered. Raises ValueError
+    for targets that cannot be resolved or when there are too many.
+    """
+    addresses: t.Dict[str, None] = {}
+    for target in targets.replace(",", " ").split():
+        try:
+            network = ipaddress.ip_network(target, strict=False)
+        except ValueError:
+            try:
+                infos = await hass.loop.getaddrinfo(target, DEFAULT_PORT, family=socket.AF_INET, type=socket.SOCK_DGRAM)
+            except OSError as err:
+                raise ValueError(f"Unable to resolve {target}") from err
+            addresses.update(dict.fromkeys(info[4][0] for info in infos))
+            continue
+
+        if network.version != 4:
+            raise ValueError(f"{target} is not an IPv4 network")
+        if network.num_addresses > MAX_DISCOVERY_HOSTS:
+            raise ValueError(f"{target} has more than {MAX_DISCOVERY_HOSTS} addresses")
+        addresses.update(dict.fromkeys(str(host) for host in network.hosts()))
+        if network.num_addresses > 2:
+            addresses[str(network.broadcast_address)] = None
+
+        if len(addresses) > MAX_DISCOVERY_HOSTS:
+            raise ValueError(f"More than {MAX_DISCOVERY_HOSTS} addresses to sweep")
+
+    if not addresses:
+        raise ValueError("Nothing to sweep")
+    return list(addresses)
+
+
+async def async_sweep(addresses: t.Iterable[str], timeout: float) -> t.List[DiscoveredUnit]:
+    """Send a hello to every address at once and return the units that answered.
+
+    Only units of DEVICE_TYPE are returned, ordered by address.
+    """
+    units = []
+    for mac, (host, devtype, name, is_locked) in (await async_hello(addresses, timeout, DEFAULT_PORT)).items():
+        if devtype != DEVICE_TYPE:
+            _LOGGER.debug("Skipping %s at %s, unsupported type %s", mac.hex(), host, hex(devtype))
+            continue
+        units.append(DiscoveredUnit(host, mac, name, is_locked))
+    return sorted(units, key=lambda unit: ipaddress.ip_address(unit.host))
+
+
+async def async_read_units(hass: HomeAssistant, units: t.Iterable[DiscoveredUnit], timeout: float) -> t.List[DiscoveredUnit]:
+    """Read the status of every unit in parallel, DEFAULT_POLL_CONCURRENCY at a time.
+
+    Units that are locked or do not answer are returned without a status.
+    The reads use an endpoint of their own, closed once they are done, so
+    they neither keep nor depend on the one configured units share.
+    """
+    semaphore = asyncio.Semaphore(DEFAULT_POLL_CONCURRENCY)
+    protocol = await async_create_protocol()
+
+    async def _async_read(unit: DiscoveredUnit) -> DiscoveredUnit:
+        if unit.is_locked:
+            return unit
+
+        device = electrolux((unit.host, DEFAULT_PORT), unit.mac, DEVICE_TYPE, timeout, unit.name, "", "Electrolux", False)
+        # A unit that just answered the hello is where the sweep found it.
+        session = ElectroluxSession(hass, device, protocol, relocate=False)
+        try:
+            async with semaphore:
+                status = await session.async_call(electrolux.async_get_status, retry=DISCOVERY_RETRY)
+        except (BroadlinkException, OSError, ValueError) as err:
+            _LOGGER.debug("Unable to read %s at %s: %s", unit.mac.hex(), unit.host, err)
+            return unit
+        finally:
+            session.async_close()
+        return DiscoveredUnit(unit.host, unit.mac, unit.name, unit.is_locked, status, (device.id, device.key))
+
+    try:
+        return list(await asyncio.gather(*(_async_read(unit) for unit in units)))
+    finally:
+        protocol.close()
@@ -1,75 +1,174 @@
-import struct
 import broadlink.exceptions as e
+import json
+import time
 import typing as t
 
+from broadlink.const import DEFAULT_RETRY_INTVL
 from broadlink.device import Device
-from broadlink.exceptions import DataValidationError
+
+from dataclasses import dataclass, fields, replace
 
 from enum import IntEnum
 
+from . import capture
+from .codec import PacketCodec
+
+if t.TYPE_CHECKING:
+    from .capture import FrameRecorder
+    from .metrics import UnitMetrics
+    from .retry import RetryPolicy
+    from .transport import ElectroluxProtocol
+
 MAX_TEMP = 40
 MIN_TEMP = 0
 DEVICE_TYPE = 0x4f9b
 
-def create_from_device(device: Device):
-    return electrolux(device.host, device.mac, device.devtype, device.timeout, device.name, "", "Electrolux", device.is_locked)
+@dataclass(frozen=True, slots=True)
+class ElectroluxStatus:
+    """Status reported by a unit, fields are named after the protocol keys."""
+
+    envtemp: int = 0
+    temp: int = 0
+    ac_pwr: int = 0
+    ac_mode: int = 0
+    ac_mark: int = 0
+    ac_vdir: int = 0
+    scrdisp: int = 0
+    ac_slp: int = 0
+    mldprf: int = 0
+    timer: t.Optional[str] = None
+    sn: t.Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "ElectroluxStatus":
+        """Build a status from a decoded reply, unknown keys are dropped."""
+        return cls(*[state.get(key, default) for key, default in STATUS_DEFAULTS])
+
+    @classmethod
+    def from_json(cls, data: t.Union[bytes, memoryview]) -> "ElectroluxStatus":
+        """Parse a status reply straight from its JSON payload."""
+        state = json.loads(bytes(data))
+        if not isinstance(state, dict):
+            raise ValueError("Status is not a JSON object")
+        return cls.from_dict(state)
+
+    def diff(self, other: t.Optional["ElectroluxStatus"]) -> t.FrozenSet[str]:
+        """Return the names of the fields that differ from other."""
+        if other is None:
+            return STATUS_FIELDS
+        if self == other:
+            return frozenset()
+        return frozenset(key for key in STATUS_FIELDS if getattr(self, key) != getattr(other, key))
+
+    def merge(self, state: dict) -> "ElectroluxStatus":
+        """Return a copy with the known keys of state applied."""
+        return replace(self, **{key: value for key, value in state.items() if key in STATUS_FIELDS})
+
+STATUS_DEFAULTS = tuple((field.name, field.default) for field in fields(ElectroluxStatus))
+STATUS_FIELDS = frozenset(key for key, _ in STATUS_DEFAULTS)
 
 class electrolux(Device):
     """Controls an electrolux air conditioner.
+
+    Every request goes through the asyncio transport, call async_auth or
+    restore_auth before the first one. ElectroluxSession does both.
     """
 
     TYPE = "ELECTROLUX_OEM"
 
     def __init__(self, host: t.Tuple[str, int], mac: t.Union[bytes, str], devtype: int, timeout: int = ..., name: str = "", model: str = "", manufacturer: str = "", is_locked: bool = False) -> None:
         super().__init__(host, mac, devtype, timeout, name, model, manufacturer, is_locked)
-        self.auth()
-
-    def _send(self, command: int, data: bytes = b"") -> bytes:
-        """Send a packet to the device."""
-        packet = bytearray(0xD)
-        packet[0x00:0x02] = command.to_bytes(2, "little")
-        packet[0x02:0x06] = bytes.fromhex("a5a55a5a")
-
-        packet[0x08] = 0x01 if len(data) <= 2 else 0x02
-        packet[0x09] = 0x0b
-        packet[0xA:0xB] = len(data).to_bytes(2, "little")
-
-        packet.extend(data)
-
-        d_checksum = sum(packet[0x08:], 0xC0AD) & 0xFFFF
-        packet[0x06:0x08] = d_checksum.to_bytes(2, "little")
-
-        #print(' '.join(format(x, '02x') for x in packet))
-
-        resp = self.send_packet(0x6A, packet)
-        e.check_error(resp[0x22:0x24])
-        dcry = self.decrypt(resp[0x38:])
-
-        r_checksum = sum(dcry[0x08:], 0xC0AD) & 0xFFFF
-        r_response = struct.unpack("h", dcry[0x06:0x08])[0]
-
-        if r_checksum != r_response:
-            raise e.BroadlinkException(DataValidationError, "Failed to validate JSON checksum.")
-
-        r_length = struct.unpack("h", dcry[0xA:0xC])[0]
-
-        payload = dcry[0xE:0xE + r_length]
-
+        self.protocol: t.Optional["ElectroluxProtocol"] = None
+        self.retry: t.Optional["RetryPolicy"] = None
+        self.metrics: t.Optional["UnitMetrics"] = None
+        self.codec = PacketCodec()
+        # Session key from the last auth, self.aes is the cipher built from it.
+        self.key: t.Optional[bytes] = None
+        self.recorder: t.Optional["FrameRecorder"] = None
+
+    def _unpack(self, resp: bytes) -> memoryview:
+        """Decrypt a 0x6A response and return a view of its JSON payload."""
+        self.codec.check_frame(resp)
+        return self.codec.unpack_command(self.codec.decrypt_frame(resp, self.aes))
+
+    async def async_send_packet(self, packet_type: int, payload: bytes) -> bytes:
+        """Send a packet to the device over the asyncio transport."""
+        if self.protocol is None:
+            raise e.BroadlinkException("Transport not connected.")
+
+        self.count = ((self.count + 1) | 0x8000) & 0xFFFF
+        packet = self.codec.pack_frame(packet_type, payload, self.devtype, self.count, self.mac, self.id, self.aes)
+        if self.recorder is not None:
+            self.recorder.record(capture.TX, packet)
+        resp = await self.protocol.async_request(packet, self.host, self.count, self._timeouts(), self.metrics)
+        if self.recorder is not None:
+            self.recorder.record(capture.RX, resp)
+        self.codec.check_frame(resp)
+        return resp
+
+    def _timeouts(self) -> t.List[float]:
+        """Return how long to wait after each send of the next packet."""
+        if self.retry is not None:
+            return self.retry.timeouts(self.timeout)
+        # Without a policy resend every DEFAULT_RETRY_INTVL like send_packet.
+        sends = max(1, -(-self.timeout // DEFAULT_RETRY_INTVL))
+        return [self.timeout / sends] * int(sends)
+
+    async def async_auth(self) -> bool:
+        """Authenticate to the device over the asyncio transport."""
+        self.id = 0
+        self.update_aes(bytes.fromhex(self._Device__INIT_KEY))
+
+        packet = bytearray(0x50)
+        packet[0x04:0x14] = [0x31] * 16
+        packet[0x1E] = 0x01
+        packet[0x2D] = 0x01
+        packet[0x30:0x36] = "Test 1".encode()
+
+        response = await self.async_send_packet(0x65, packet)
+        payload = self.codec.decrypt_frame(response, self.aes)
+
+        self.id = int.from_bytes(payload[:0x4], "little")
+        self.key = bytes(payload[0x04:0x14])
+        self.update_aes(self.key)
+        if self.recorder is not None:
+            self.recorder.record_key(self.id, self.key)
+        return True
+
+    def restore_auth(self, dev_id: int, key: bytes) -> None:
+        """Use a device id and session key from an earlier auth."""
+        self.id = dev_id
+        self.key = key
+        self.update_aes(key)
+        if self.recorder is not None:
+            self.recorder.record_key(dev_id, key)
+
+    async def _async_send(self, command: int, data: bytes = b"") -> memoryview:
+        """Send a packet to the device over the asyncio transport."""
+        start = time.monotonic()
+        try:
+            resp = await self.async_send_packet(0x6A, self.codec.pack_command(command, data))
+            payload = self.codec.unpack_command(self.codec.decrypt_frame(resp, self.aes))
+        except e.DataValidationError:
+            if self.metrics is not None:
+                self.metrics.checksum_failures += 1
+            raise
+
+        if self.metrics is not None:
+            self.metrics.record_command(command, time.monotonic() - start)
         return payload
 
-    def get_status(self) -> str:
-        resp = self._send(0x0e, bytearray('{}', "ascii"))
+    async def async_write(self, packets: t.List[t.Tuple[int, bytes]]) -> str:
+        """Send (command, payload) pairs in order and return the last reply."""
+        resp = b""
+        for command, data in packets:
+            resp = await self._async_send(command, data)
         return str(resp, "ascii")
 
-    def set_temp(self, temp: int) -> str:
-        temp = max(MIN_TEMP, min(temp, MAX_TEMP))
-        resp = self._send(0x17, bytearray('{"temp":%s}'%(temp), "ascii"))
-        return str(resp, "ascii")
+    async def async_get_status(self) -> ElectroluxStatus:
+        resp = await self._async_send(0x0e, bytearray('{}', "ascii"))
+        return ElectroluxStatus.from_json(resp)
 
-    def set_power(self, power_on: bool) -> str:
-        resp = self._send(0x18, bytearray('{"ac_pwr":%s}'%(1 if power_on else 0), "ascii"))
-        return str(resp, "ascii")
-    
     class mode(IntEnum):
         AUTO = 4,
         COOL = 0,
@@ -78,10 +177,6 @@ class electrolux(Device):
         FAN = 3,
         HEAT_8 = 6
 
-    def set_mode(self, mode: mode) -> str:
-        resp = self._send(0x19, bytearray('{"ac_mode":%s}'%(mode.value), "ascii"))
-        return str(resp, "ascii")
-    
     class fan(IntEnum):
         AUTO = 0,
         LOW = 1,
@@ -89,35 +184,3 @@ class electrolux(Device):
         HIGH = 3,
         TURBO = 4,
         QUIET = 5
-
-    def set_fan(self, fan: fan) -> str:
-        resp = self._send(0x19, bytearray('{"ac_mark":%s}'%(fan.value), "ascii"))
-        return str(resp, "ascii")
-
-    def set_swing(self, swing_on: bool) -> str:
-        resp = self._send(0x19, bytearray('{"ac_vdir":%s}'%(1 if swing_on else 0), "ascii"))
-        return str(resp, "ascii")
-
-    def set_led(self, led_on: bool) -> str:
-        resp = self._send(0x19, bytearray('{"scrdisp":%s}'%(1 if led_on else 0), "ascii"))
-        return str(resp, "ascii")
-
-    def set_sleep(self, sleep_on: bool) -> str:
-        resp = self._send(0x18, bytearray('{"ac_slp":%s}'%(1 if sleep_on else 0), "ascii"))
-        return str(resp, "ascii")
-
-    def set_self_clean(self, clean_on: bool) -> str:
-        resp = self._send(0x18, bytearray('{"mldprf":%s}'%(1 if clean_on else 0), "ascii"))
-        return str(resp, "ascii")
-
-    def set_timer(self, on_timer: bool, hours: int, minutes: int) -> str:
-
-        hours = max(0, min(hours, 23))
-        minutes = max(0, min(minutes, 59))
-
-        resp = self._send(0x1f, bytearray('{"timer":"%02d%02d|0%s"}'%(hours,minutes,1 if on_timer else 0), "ascii"))
-        return str(resp, "ascii")
-
-    def clear_timer(self, on_timer: bool) -> str:
-        resp = self.set_timer(on_timer, 0, 0)
-        return resp
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""Base entity for the Electrolux Climate integration."""
+import typing as t
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import ElectroluxCoordinator
+
+
+class ElectroluxEntity(CoordinatorEntity[ElectroluxCoordinator]):
+    """Entity backed by a unit's status.
+
+    Subclasses list the status fields they render in _status_fields and
+    implement _update_from_status(state) to set their attributes from a
+    status. It is only called when one of those fields changed, and the
+    state is only written then or when the availability changed. Until
+    the unit first answers they show the restored status as an assumed
+    state.
+    """
+
+    _status_fields: t.FrozenSet[str] = frozenset()
+
+    def __init__(self, coordinator: ElectroluxCoordinator, sn: str) -> None:
+        super().__init__(coordinator)
+        self.sn = sn
+        self._attr_available = True
+        self._written_available = True
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if self.coordinator.changed_fields & self._status_fields:
+            self._update_from_status(self.coordinator.data)
+        elif self.available == self._written_available:
+            return
+
+        self._written_available = self.available
+        super()._handle_coordinator_update()
+
+    @property
+    def assumed_state(self) -> bool:
+        return self.coordinator.restored
+
+    @property
+    def available(self) -> bool:
+        return super().available and self._attr_available
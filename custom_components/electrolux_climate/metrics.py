@@ -0,0 +1,100 @@
+"""Request metrics for the Electrolux Climate integration."""
+import bisect
+import collections
+import typing as t
+
+# Upper bounds of the latency histogram buckets, in seconds.
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RECENT_SAMPLES = 256
+
+COMMAND_NAMES = {
+    0x0e: "status",
+    0x17: "temp",
+    0x18: "power",
+    0x19: "mode",
+    0x1f: "timer",
+}
+
+
+class LatencyHistogram:
+    """Cumulative bucket counts plus a window of recent samples for percentiles."""
+
+    __slots__ = ("counts", "count", "total", "max", "recent")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: t.Deque[float] = collections.deque(maxlen=RECENT_SAMPLES)
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def percentile(self, percent: float) -> t.Optional[float]:
+        """Return the given percentile of the recent samples, None without samples."""
+        if not self.recent:
+            return None
+        samples = sorted(self.recent)
+        return samples[min(int(len(samples) * percent / 100), len(samples) - 1)]
+
+    def as_dict(self) -> dict:
+        # Samples per bucket, keyed by the bucket's upper bound.
+        buckets = {str(bound): count for bound, count in zip(LATENCY_BUCKETS, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": buckets,
+        }
+
+
+class UnitMetrics:
+    """Latency and error counters for one unit."""
+
+    def __init__(self) -> None:
+        self.commands: t.Dict[int, LatencyHistogram] = collections.defaultdict(LatencyHistogram)
+        self.polls = LatencyHistogram()
+        self.timeouts = 0
+        self.retransmits = 0
+        self.checksum_failures = 0
+        self.auths = 0
+        self.auth_failures = 0
+        self.reauths = 0
+        self.pushes = 0
+
+    def record_command(self, command: int, seconds: float) -> None:
+        self.commands[command].record(seconds)
+
+    def writes(self) -> LatencyHistogram:
+        """Return the latency of every command except status reads combined."""
+        combined = LatencyHistogram()
+        for command, histogram in self.commands.items():
+            if command != 0x0e:
+                for sample in histogram.recent:
+                    combined.record(sample)
+        return combined
+
+    def as_dict(self) -> dict:
+        return {
+            "commands": {
+                COMMAND_NAMES.get(command, hex(command)): histogram.as_dict()
+                for command, histogram in sorted(self.commands.items())
+            },
+            "polls": self.polls.as_dict(),
+            "timeouts": self.timeouts,
+            "retransmits": self.retransmits,
+            "checksum_failures": self.checksum_failures,
+            "auths": self.auths,
+            "auth_failures": self.auth_failures,
+            "reauths": self.reauths,
+            "pushes": self.pushes,
+        }
@@ -0,0 +1,94 @@
+"""Timer numbers for the Electrolux Climate integration."""
+from dataclasses import dataclass
+
+from homeassistant.components.number import NumberDeviceClass, NumberEntity, NumberEntityDescription, NumberMode
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_MAC, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+
+from . import commands
+from .const import DOMAIN, CONF_SN
+from .coordinator import ElectroluxCoordinator
+from .electrolux import ElectroluxStatus
+from .entity import ElectroluxEntity
+
+
+@dataclass(frozen=True, kw_only=True)
+class ElectroluxTimerDescription(NumberEntityDescription):
+    on_timer: bool
+
+
+TIMER = dict(
+    native_min_value=0,
+    native_max_value=23 * 60 + 59,
+    native_step=1,
+    native_unit_of_measurement=UnitOfTime.MINUTES,
+    device_class=NumberDeviceClass.DURATION,
+    mode=NumberMode.BOX,
+)
+
+TIMERS = (
+    ElectroluxTimerDescription(key="on_timer", name="On timer", icon="mdi:timer-play-outline", on_timer=True, **TIMER),
+    ElectroluxTimerDescription(key="off_timer", name="Off timer", icon="mdi:timer-off-outline", on_timer=False, **TIMER),
+)
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, add_entities_async) -> bool:
+    """Set up Electrolux timers from a config entry."""
+
+    mac = bytes.fromhex(entry.data[CONF_MAC])
+    name = entry.title
+    sn = entry.data[CONF_SN]
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    add_entities_async([ElectroluxTimerEntity(coordinator, description, sn, name, mac) for description in TIMERS])
+
+    return True
+
+
+class ElectroluxTimerEntity(ElectroluxEntity, NumberEntity):
+    """Minutes until the unit turns on or off, 0 when the timer is not set.
+
+    The unit reports one timer at a time, so setting the other one shows
+    this one as 0 even if the unit still runs it.
+    """
+
+    entity_description: ElectroluxTimerDescription
+
+    _status_fields = frozenset({"sn", "timer"})
+
+    def __init__(self,
+        coordinator: ElectroluxCoordinator,
+        description: ElectroluxTimerDescription,
+        sn: str,
+        name: str,
+        mac: bytes):
+        super().__init__(coordinator, sn)
+        self.entity_description = description
+
+        self.mac = mac
+        self._attr_unique_id = f"{sn}-{description.key}"
+        self._attr_name = f"{name} {description.name}"
+
+        self._update_from_status(coordinator.data)
+
+    def _update_from_status(self, state: ElectroluxStatus):
+        if state.sn is not None and state.sn != self.sn:
+            self._attr_available = False
+            return
+        self._attr_available = True
+        self._attr_native_value = commands.timer_minutes(state.timer, self.entity_description.on_timer)
+
+    async def async_set_native_value(self, value: float) -> None:
+        hours, minutes = divmod(int(value), 60)
+        self.coordinator.async_write(commands.timer(self.entity_description.on_timer, hours, minutes))
+
+    @property
+    def device_info(self) -> dr.DeviceInfo:
+        """Return device info."""
+        return dr.DeviceInfo(
+            connections={(dr.CONNECTION_NETWORK_MAC, self.mac.hex())},
+            identifiers={(DOMAIN, self.sn)},
+        )
@@ -0,0 +1,110 @@
+"""Retry policy and circuit breaker for the Electrolux Climate integration."""
+import logging
+import random
+import time
+import typing as t
+
+from broadlink.exceptions import BroadlinkException
+
+from .const import (
+    RETRY_ATTEMPTS,
+    RETRY_TIMEOUT,
+    RETRY_BACKOFF,
+    RETRY_MAX_TIMEOUT,
+    RETRY_JITTER,
+    WRITE_ATTEMPTS,
+    BREAKER_THRESHOLD,
+    BREAKER_COOLDOWN,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CircuitOpenError(BroadlinkException):
+    """Raised instead of sending to a unit that stopped answering."""
+
+
+class RetryPolicy:
+    """How often a frame is sent and how long to wait for a reply after each send.
+
+    The wait grows by backoff after every unanswered send, with up to
+    jitter of it added at random so units that dropped together do not
+    retry together.
+    """
+
+    def __init__(
+        self,
+        attempts: int = RETRY_ATTEMPTS,
+        timeout: float = RETRY_TIMEOUT,
+        backoff: float = RETRY_BACKOFF,
+        max_timeout: float = RETRY_MAX_TIMEOUT,
+        jitter: float = RETRY_JITTER,
+    ) -> None:
+        self.attempts = attempts
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_timeout = max_timeout
+        self.jitter = jitter
+
+    def timeouts(self, budget: t.Optional[float] = None) -> t.List[float]:
+        """Return the wait after each send, cut off once budget seconds are used."""
+        timeouts = []
+        timeout = self.timeout
+        for _ in range(self.attempts):
+            wait = min(timeout, self.max_timeout) * (1 + random.uniform(0, self.jitter))
+            if budget is not None:
+                wait = min(wait, budget - sum(timeouts))
+                if wait <= 0:
+                    break
+            timeouts.append(wait)
+            timeout *= self.backoff
+        return timeouts
+
+
+# Status reads are idempotent and may be sent as often as needed. Writes
+# are retransmitted as the same frame, with the same counter, so a late
+# reply to any copy completes the write and it is never encoded twice.
+READ_RETRY = RetryPolicy()
+WRITE_RETRY = RetryPolicy(attempts=WRITE_ATTEMPTS)
+PROBE_RETRY = RetryPolicy(attempts=1)
+
+
+class CircuitBreaker:
+    """Stops talking to a unit after repeated timeouts.
+
+    After threshold calls in a row fail to get a reply the breaker opens
+    and calls fail straight away. Once cooldown seconds have passed one
+    call is let through as a single send probe; its success closes the
+    breaker again, its failure restarts the cooldown.
+    """
+
+    def __init__(self, name: str, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN, clock: t.Callable[[], float] = time.monotonic) -> None:
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self.failures = 0
+        self.opened_at: t.Optional[float] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def check(self) -> None:
+        """Raise CircuitOpenError if calls should not reach the unit yet."""
+        if self.opened_at is not None and self._clock() - self.opened_at < self.cooldown:
+            raise CircuitOpenError(f"{self.name} is not responding, next probe in {self.cooldown - (self._clock() - self.opened_at):.0f}s")
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            _LOGGER.info("%s is responding again", self.name)
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.opened_at is not None:
+            self.opened_at = self._clock()
+        elif self.failures >= self.threshold:
+            _LOGGER.warning("%s did not respond %s times in a row, pausing requests for %ss", self.name, self.failures, self.cooldown)
+            self.opened_at = self._clock()
@@ -0,0 +1,103 @@
+"""Central poll scheduler for the Electrolux Climate integration."""
+import asyncio
+import logging
+import random
+import typing as t
+from datetime import datetime, timedelta
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from .coordinator import ElectroluxCoordinator
+from .metrics import LatencyHistogram
+from .const import DATA_SCHEDULER, DEFAULT_POLL_CONCURRENCY, POLL_JITTER, SCAN_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PollScheduler:
+    """Polls every registered unit from one timer.
+
+    Each unit gets a fixed random phase within the first part of the
+    interval so packets do not all leave on the same tick, and at most
+    concurrency polls run at once. A unit is only polled once its own
+    adaptive poll_interval has passed since its last sweep.
+    """
+
+    def __init__(self, hass: HomeAssistant, concurrency: int = DEFAULT_POLL_CONCURRENCY, interval: timedelta = SCAN_INTERVAL) -> None:
+        self.hass = hass
+        self.interval = interval
+        self.concurrency = concurrency
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._units: dict[ElectroluxCoordinator, float] = {}
+        self._last_poll: dict[ElectroluxCoordinator, float] = {}
+        self._in_flight: set[ElectroluxCoordinator] = set()
+        self._unsub: t.Optional[CALLBACK_TYPE] = None
+
+        self.last_cycle_duration: t.Optional[float] = None
+        self.cycle_durations = LatencyHistogram()
+        self.cycles = 0
+        self.overruns = 0
+
+    @callback
+    def async_register(self, coordinator: ElectroluxCoordinator) -> CALLBACK_TYPE:
+        """Add a unit to the sweep, returns a callback that removes it again."""
+        self._units[coordinator] = random.uniform(0, self.interval.total_seconds() * POLL_JITTER)
+
+        if self._unsub is None:
+            self._unsub = async_track_time_interval(
+                self.hass, self._async_sweep, self.interval, name="electrolux_climate poll", cancel_on_shutdown=True)
+
+        @callback
+        def _async_unregister() -> None:
+            self._units.pop(coordinator, None)
+            self._last_poll.pop(coordinator, None)
+            if not self._units and self._unsub is not None:
+                self._unsub()
+                self._unsub = None
+
+        return _async_unregister
+
+    async def _async_sweep(self, now: datetime) -> None:
+        start = self.hass.loop.time()
+        # Ticks drift slightly, allow half an interval of slack.
+        slack = self.interval.total_seconds() / 2
+        units = [
+            (coordinator, phase) for coordinator, phase in self._units.items()
+            if coordinator not in self._in_flight
+            and start - self._last_poll.get(coordinator, float("-inf")) >= coordinator.poll_interval.total_seconds() - slack
+        ]
+        if not units:
+            return
+
+        for coordinator, _ in units:
+            self._last_poll[coordinator] = start
+        await asyncio.gather(*(self._async_poll(coordinator, phase) for coordinator, phase in units))
+        self.last_cycle_duration = self.hass.loop.time() - start
+        self.cycle_durations.record(self.last_cycle_duration)
+        self.cycles += 1
+
+        if self.last_cycle_duration > self.interval.total_seconds():
+            self.overruns += 1
+            _LOGGER.warning(
+                "Polling %s units took %.1fs, longer than the %ss scan interval",
+                len(units), self.last_cycle_duration, self.interval.total_seconds())
+        else:
+            _LOGGER.debug("Polled %s units in %.2fs", len(units), self.last_cycle_duration)
+
+    async def _async_poll(self, coordinator: ElectroluxCoordinator, phase: float) -> None:
+        self._in_flight.add(coordinator)
+        try:
+            await asyncio.sleep(phase)
+            async with self._semaphore:
+                if coordinator in self._units:
+                    await coordinator.async_refresh()
+        finally:
+            self._in_flight.discard(coordinator)
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> PollScheduler:
+    """Return the integration wide poll scheduler."""
+    if DATA_SCHEDULER not in hass.data:
+        hass.data[DATA_SCHEDULER] = PollScheduler(hass)
+    return hass.data[DATA_SCHEDULER]
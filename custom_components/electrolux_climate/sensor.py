@@ -0,0 +1,102 @@
+"""Diagnostic sensors for the Electrolux Climate integration."""
+import typing as t
+from dataclasses import dataclass
+from datetime import timedelta
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorEntityDescription, SensorStateClass
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_MAC, EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import DOMAIN, CONF_SN
+from .coordinator import ElectroluxCoordinator
+from .metrics import LatencyHistogram, UnitMetrics
+
+# Metrics live in memory, reading them costs no device traffic.
+METRICS_INTERVAL = timedelta(seconds=60)
+
+
+def _p95_ms(histogram: LatencyHistogram) -> t.Optional[float]:
+    value = histogram.percentile(95)
+    return None if value is None else round(value * 1000, 1)
+
+
+@dataclass(frozen=True, kw_only=True)
+class ElectroluxMetricDescription(SensorEntityDescription):
+    value_fn: t.Callable[[UnitMetrics], t.Optional[float]]
+
+
+LATENCY = dict(
+    native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+    device_class=SensorDeviceClass.DURATION,
+    state_class=SensorStateClass.MEASUREMENT,
+)
+COUNTER = dict(state_class=SensorStateClass.TOTAL_INCREASING)
+
+SENSORS = (
+    ElectroluxMetricDescription(key="status_latency", name="Status latency", value_fn=lambda metrics: _p95_ms(metrics.commands[0x0e]), **LATENCY),
+    ElectroluxMetricDescription(key="command_latency", name="Command latency", value_fn=lambda metrics: _p95_ms(metrics.writes()), **LATENCY),
+    ElectroluxMetricDescription(key="poll_duration", name="Poll duration", value_fn=lambda metrics: _p95_ms(metrics.polls), **LATENCY),
+    ElectroluxMetricDescription(key="timeouts", name="Timeouts", value_fn=lambda metrics: metrics.timeouts, **COUNTER),
+    ElectroluxMetricDescription(key="retransmits", name="Retransmits", value_fn=lambda metrics: metrics.retransmits, **COUNTER),
+    ElectroluxMetricDescription(key="checksum_failures", name="Checksum failures", value_fn=lambda metrics: metrics.checksum_failures, **COUNTER),
+    ElectroluxMetricDescription(key="auths", name="Authentications", value_fn=lambda metrics: metrics.auths, **COUNTER),
+    ElectroluxMetricDescription(key="auth_failures", name="Authentication failures", value_fn=lambda metrics: metrics.auth_failures, **COUNTER),
+)
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, add_entities_async) -> bool:
+    """Set up Electrolux diagnostic sensors from a config entry."""
+
+    mac = bytes.fromhex(entry.data[CONF_MAC])
+    name = entry.title
+    sn = entry.data[CONF_SN]
+
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    add_entities_async([ElectroluxMetricSensor(coordinator, description, sn, name, mac) for description in SENSORS])
+
+    return True
+
+
+class ElectroluxMetricSensor(SensorEntity):
+    """Latency or error counter of a unit, disabled by default."""
+
+    entity_description: ElectroluxMetricDescription
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_should_poll = False
+
+    def __init__(self,
+        coordinator: ElectroluxCoordinator,
+        description: ElectroluxMetricDescription,
+        sn: str,
+        name: str,
+        mac: bytes):
+        self.entity_description = description
+        self.metrics = coordinator.session.metrics
+
+        self.mac = mac
+        self.sn = sn
+        self._attr_unique_id = f"{sn}-{description.key}"
+        self._attr_name = f"{name} {description.name}"
+
+    async def async_added_to_hass(self) -> None:
+        self._attr_native_value = self.entity_description.value_fn(self.metrics)
+        self.async_on_remove(async_track_time_interval(self.hass, self._async_refresh, METRICS_INTERVAL))
+
+    @callback
+    def _async_refresh(self, now) -> None:
+        self._attr_native_value = self.entity_description.value_fn(self.metrics)
+        self.async_write_ha_state()
+
+    @property
+    def device_info(self) -> dr.DeviceInfo:
+        """Return device info."""
+        return dr.DeviceInfo(
+            connections={(dr.CONNECTION_NETWORK_MAC, self.mac.hex())},
+            identifiers={(DOMAIN, self.sn)},
+        )
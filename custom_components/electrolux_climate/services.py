@@ -0,0 +1,119 @@
+"""Fleet wide services for the Electrolux Climate integration."""
+import asyncio
+import logging
+import typing as t
+
+import voluptuous as vol
+import homeassistant.helpers.config_validation as cv
+
+from homeassistant.components.climate import ATTR_FAN_MODE, ATTR_HVAC_MODE, ATTR_SWING_MODE, HVACMode, SWING_OFF, SWING_VERTICAL
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_TEMPERATURE, ENTITY_MATCH_ALL, Platform
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.service import async_extract_entity_ids
+
+from broadlink.exceptions import BroadlinkException
+
+from . import commands
+from .climate import ELE_MODES, ELE_FANS
+from .coordinator import ElectroluxCoordinator
+from .electrolux import electrolux
+from .const import DOMAIN, GROUP_CONCURRENCY, MAX_STAGGER
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_GROUP_SET = "group_set"
+ATTR_STAGGER = "stagger"
+
+GROUP_SET_SCHEMA = vol.All(
+    vol.Schema({
+        **cv.ENTITY_SERVICE_FIELDS,
+        vol.Optional(ATTR_HVAC_MODE): vol.Coerce(HVACMode),
+        vol.Optional(ATTR_TEMPERATURE): vol.Coerce(int),
+        vol.Optional(ATTR_FAN_MODE): vol.In(list(ELE_FANS)),
+        vol.Optional(ATTR_SWING_MODE): vol.In([SWING_OFF, SWING_VERTICAL]),
+        vol.Optional(ATTR_STAGGER, default=0): vol.All(vol.Coerce(float), vol.Range(min=0, max=MAX_STAGGER)),
+    }),
+    cv.has_at_least_one_key(ATTR_HVAC_MODE, ATTR_TEMPERATURE, ATTR_FAN_MODE, ATTR_SWING_MODE),
+)
+
+
+def _values(data: dict) -> dict:
+    """Return the status values a group_set call writes."""
+    values = {}
+    if (hvac_mode := data.get(ATTR_HVAC_MODE)) is not None:
+        if hvac_mode == HVACMode.OFF:
+            values |= commands.power(False)
+        else:
+            values |= commands.power(True) | commands.mode(ELE_MODES.get(hvac_mode, electrolux.mode.AUTO))
+    if (temperature := data.get(ATTR_TEMPERATURE)) is not None:
+        values |= commands.temp(temperature)
+    if (fan_mode := data.get(ATTR_FAN_MODE)) is not None:
+        values |= commands.fan(ELE_FANS[fan_mode])
+    if (swing_mode := data.get(ATTR_SWING_MODE)) is not None:
+        values |= commands.swing(swing_mode == SWING_VERTICAL)
+    return values
+
+
+@callback
+def _async_targets(hass: HomeAssistant, call: ServiceCall, entity_ids: t.Set[str]) -> t.Dict[str, ElectroluxCoordinator]:
+    """Return the coordinator of every targeted climate entity, by entity id."""
+    coordinators = hass.data.get(DOMAIN, {})
+    registry = er.async_get(hass)
+    every = call.data.get(ATTR_ENTITY_ID) == ENTITY_MATCH_ALL
+
+    targets = {}
+    for entity in registry.entities.values():
+        if entity.platform != DOMAIN or entity.domain != Platform.CLIMATE:
+            continue
+        if not every and entity.entity_id not in entity_ids:
+            continue
+        if (coordinator := coordinators.get(entity.config_entry_id)) is not None:
+            targets[entity.entity_id] = coordinator
+    return targets
+
+
+async def _async_group_set(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    values = _values(call.data)
+    targets = _async_targets(hass, call, await async_extract_entity_ids(hass, call))
+    semaphore = asyncio.Semaphore(GROUP_CONCURRENCY)
+
+    # Units that are switched on start stagger seconds apart, so they do
+    # not all draw their inrush current at once.
+    delays = {}
+    powering_on = 0
+    for entity_id, coordinator in targets.items():
+        turns_on = values.get("ac_pwr") == 1 and (coordinator.data is None or coordinator.data.ac_pwr == 0)
+        delays[entity_id] = powering_on * call.data[ATTR_STAGGER] if turns_on else 0
+        powering_on += turns_on
+
+    async def _async_set(entity_id: str, coordinator: ElectroluxCoordinator) -> dict:
+        if delays[entity_id]:
+            await asyncio.sleep(delays[entity_id])
+        async with semaphore:
+            started = hass.loop.time()
+            try:
+                await coordinator.async_write(values)
+            except (BroadlinkException, OSError) as err:
+                _LOGGER.warning("group_set failed for %s: %s", entity_id, err)
+                return {"success": False, "latency": round(hass.loop.time() - started, 3), "error": str(err)}
+            return {"success": True, "latency": round(hass.loop.time() - started, 3)}
+
+    results = await asyncio.gather(*(_async_set(entity_id, coordinator) for entity_id, coordinator in targets.items()))
+    units = dict(zip(targets, results))
+    failed = [entity_id for entity_id, result in units.items() if not result["success"]]
+    _LOGGER.debug("group_set %s on %s units, %s failed", values, len(units), len(failed))
+
+    return {"units": units, "failed": failed}
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services."""
+
+    async def _async_handle_group_set(call: ServiceCall) -> ServiceResponse:
+        return await _async_group_set(hass, call)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_GROUP_SET, _async_handle_group_set,
+        schema=GROUP_SET_SCHEMA, supports_response=SupportsResponse.OPTIONAL)
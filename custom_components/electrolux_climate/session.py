@@ -0,0 +1,362 @@
+"""Authenticated device sessions for the Electrolux Climate integration."""
+import asyncio
+import ipaddress
+import json
+import logging
+import typing as t
+
+from datetime import datetime
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from broadlink import DEFAULT_PORT, DEFAULT_TIMEOUT
+from broadlink.exceptions import AuthenticationError, AuthorizationError, BroadlinkException, ConnectionClosedError, NetworkTimeoutError
+
+from .electrolux import electrolux, ElectroluxStatus, DEVICE_TYPE
+from .capture import FrameRecorder, RX
+from .codec import PacketCodec, PING_FRAME, COMMAND_REPLY, STATUS_COMMAND, command_id, frame_type
+from .commands import CommandBatcher
+from .metrics import UnitMetrics
+from .retry import CircuitBreaker, RetryPolicy, READ_RETRY, WRITE_RETRY, PROBE_RETRY
+from .transport import ElectroluxProtocol, async_get_transport, async_close_transport, async_hello, async_resolve
+from .const import DATA_SESSIONS, COMMAND_WINDOW, KEEPALIVE_INTERVAL, CAPTURE_FLUSH_INTERVAL, RELOCATE_PREFIX, RELOCATE_TIMEOUT, RELOCATE_COOLDOWN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Errors the device reports when it no longer accepts our session key.
+AUTH_ERRORS = (AuthenticationError, AuthorizationError, ConnectionClosedError)
+
+
+class ElectroluxSession:
+    """Owns the one authenticated electrolux device for a unit.
+
+    Calls are sent with a RetryPolicy and go through a CircuitBreaker, so
+    a unit that stopped answering fails fast instead of holding its poll
+    slot for the full timeout every time.
+
+    Calls run one at a time in the order they were made, so writes reach
+    the unit in order and never interleave with an auth. Concurrent status
+    reads share one request, unless a write was queued after it started.
+
+    The session key can be restored from an earlier auth. It is used until
+    the unit rejects it or leaves a request with it unanswered, the call
+    then authenticates and retries straight away. Every new key is passed
+    to the auth listener, so it can be saved for the next start.
+
+    A unit that stops answering may have a new DHCP lease. On its first
+    timeout, and on every failed probe while the breaker is open, the
+    session looks for its MAC on the network of the old address, at most
+    once per RELOCATE_COOLDOWN. When found it moves over to the new
+    address and tells the host listener, all without losing its state.
+
+    Frames go through the integration wide endpoint from async_get_transport,
+    or an endpoint the session was given, which also hands the session any
+    frame from its unit that no request waits for. In push mode the unit
+    keeps sending status frames while keepalives continue, and their
+    values are passed on to the push listener.
+    """
+
+    def __init__(self, hass: HomeAssistant, device: electrolux, protocol: t.Optional[ElectroluxProtocol] = None, relocate: bool = True) -> None:
+        self.hass = hass
+        self.device = device
+        # Sessions outside the registry bring an endpoint they own.
+        self._protocol = protocol
+        self.relocate = relocate
+        self.authenticated = False
+        # Restored keys are not trusted until the unit answered one request.
+        self._restored_auth = False
+        self.auth_listener: t.Optional[t.Callable[[int, bytes], None]] = None
+        self.host_listener: t.Optional[t.Callable[[str], None]] = None
+        self._relocated_at: t.Optional[float] = None
+        self._lock = asyncio.Lock()
+        self.breaker = CircuitBreaker(device.name or device.mac.hex())
+        self.metrics = device.metrics = UnitMetrics()
+        self._status_task: t.Optional[asyncio.Task] = None
+        self._status_writes = 0
+        self._writes = 0
+
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.merged_reads = 0
+        self.commands = CommandBatcher(hass, self._async_send_packets, COMMAND_WINDOW)
+        self._push_listener: t.Optional[t.Callable[[dict], None]] = None
+        # Pushes are decoded apart from requests, so they never share buffers.
+        self._push_codec: t.Optional[PacketCodec] = None
+        self._unlisten: t.Optional[CALLBACK_TYPE] = None
+
+    async def async_call(self, func: t.Callable[..., t.Awaitable[t.Any]], *args, retry: RetryPolicy = READ_RETRY) -> t.Any:
+        """Await func(device, *args), connecting and authenticating first if needed."""
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            async with self._lock:
+                self.breaker.check()
+                # Once the breaker is open every call is a single send probe.
+                self.device.retry = PROBE_RETRY if self.breaker.is_open else retry
+
+                try:
+                    result = await self._async_call(func, *args)
+                except (NetworkTimeoutError, OSError) as err:
+                    if isinstance(err, NetworkTimeoutError):
+                        self.metrics.timeouts += 1
+                    # Look for the unit when it first stops answering and on
+                    # every failed probe, RELOCATE_COOLDOWN keeps sweeps apart.
+                    search = self.breaker.failures == 0 or self.breaker.is_open
+                    self.breaker.record_failure()
+                    if not search or not await self._async_relocate():
+                        raise
+                    self.device.retry = retry
+                    result = await self._async_call(func, *args)
+                self._restored_auth = False
+                self.breaker.record_success()
+                return result
+        finally:
+            self.queue_depth -= 1
+
+    async def _async_call(self, func: t.Callable[..., t.Awaitable[t.Any]], *args) -> t.Any:
+        if self.device.protocol is None or self.device.protocol.transport is None:
+            await self._async_attach()
+
+        if not self.authenticated:
+            await self._async_auth()
+
+        try:
+            return await func(self.device, *args)
+        except AUTH_ERRORS as err:
+            _LOGGER.debug("Session for %s rejected (%s), re-authenticating", self.device.mac.hex(), err)
+            self.metrics.reauths += 1
+            await self._async_auth()
+            return await func(self.device, *args)
+        except NetworkTimeoutError:
+            if not self._restored_auth:
+                raise
+            # Some firmwares drop frames with an unknown key instead of
+            # rejecting them, so a restored key gets no second chance.
+            _LOGGER.debug("Restored session for %s not answered, re-authenticating", self.device.mac.hex())
+            self.metrics.timeouts += 1
+            self.metrics.reauths += 1
+            await self._async_auth()
+            return await func(self.device, *args)
+
+    @callback
+    def async_restore_auth(self, dev_id: int, key: bytes) -> None:
+        """Use the device id and session key of an earlier auth for the next calls."""
+        if self.authenticated:
+            return
+        self.device.restore_auth(dev_id, key)
+        self.authenticated = self._restored_auth = True
+
+    async def async_relocate(self) -> bool:
+        """Look for the unit at another address, returns True if it was found there."""
+        async with self._lock:
+            return await self._async_relocate()
+
+    async def _async_relocate(self) -> bool:
+        """Send hellos for the unit's MAC, the session lock must be held.
+
+        Hellos go to every address of the old one's network at once, the
+        old address included, and the search ends as soon as the unit
+        answers, so a unit that only dropped a packet costs one more round
+        trip.
+        """
+        if not self.relocate:
+            return False
+        now = self.hass.loop.time()
+        if self._relocated_at is not None and now - self._relocated_at < RELOCATE_COOLDOWN:
+            return False
+        self._relocated_at = now
+
+        host, port = self.device.host
+        network = ipaddress.ip_network(f"{host}/{RELOCATE_PREFIX}", strict=False)
+        addresses = [str(address) for address in network.hosts()]
+        addresses.append(str(network.broadcast_address))
+        replies = await async_hello(addresses, RELOCATE_TIMEOUT, port, self.device.mac)
+
+        if (reply := replies.get(self.device.mac)) is None or reply[0] == host:
+            _LOGGER.debug("%s not found at another address on %s", self.device.mac.hex(), network)
+            return False
+        await self.async_set_host(reply[0])
+        if self.host_listener is not None:
+            self.host_listener(reply[0])
+        return True
+
+    async def async_set_host(self, host: str) -> None:
+        """Talk to the unit at host from now on, keeping the session and its state."""
+        address = await async_resolve((host, self.device.host[1]))
+        if address == tuple(self.device.host):
+            return
+        _LOGGER.info("%s moved from %s to %s", self.device.name or self.device.mac.hex(), self.device.host[0], address[0])
+        self.device.host = address
+        if self.device.protocol is not None:
+            self._unlisten()
+            self._unlisten = self.device.protocol.async_listen(address[0], self._async_unsolicited)
+
+    async def _async_attach(self) -> None:
+        """Start sending through the shared endpoint."""
+        if self._unlisten is not None:
+            self._unlisten()
+        protocol = self._protocol or await async_get_transport(self.hass)
+        # Replies are matched by the address they come from.
+        self.device.host = await async_resolve(self.device.host)
+        self._unlisten = protocol.async_listen(self.device.host[0], self._async_unsolicited)
+        self.device.protocol = protocol
+
+    async def async_get_status(self) -> ElectroluxStatus:
+        """Fetch the status, sharing a request already in flight when possible."""
+        task = self._status_task
+        if task is None or self._status_writes != self._writes:
+            task = self._status_task = self.hass.async_create_task(self.async_call(electrolux.async_get_status))
+            self._status_writes = self._writes
+            task.add_done_callback(self._async_status_done)
+        else:
+            self.merged_reads += 1
+        # One caller giving up must not cancel the request for the others.
+        return await asyncio.shield(task)
+
+    @callback
+    def _async_status_done(self, task: asyncio.Task) -> None:
+        if self._status_task is task:
+            self._status_task = None
+
+    @callback
+    def async_write(self, values: dict) -> asyncio.Future:
+        """Queue status values to write, merged with other writes in the same window."""
+        return self.commands.async_write(values)
+
+    async def _async_send_packets(self, packets: list) -> str:
+        self._writes += 1
+        return await self.async_call(electrolux.async_write, packets, retry=WRITE_RETRY)
+
+    @callback
+    def async_enable_push(self, listener: t.Callable[[dict], None]) -> CALLBACK_TYPE:
+        """Send keepalives and pass pushed status values to listener, returns a callback that stops it."""
+        self._push_listener = listener
+        self._push_codec = PacketCodec()
+        unsub = async_track_time_interval(
+            self.hass, self._async_keepalive, KEEPALIVE_INTERVAL,
+            name=f"electrolux_climate keepalive {self.device.mac.hex()}", cancel_on_shutdown=True)
+
+        @callback
+        def _async_disable() -> None:
+            unsub()
+            self._push_listener = None
+            self._push_codec = None
+
+        return _async_disable
+
+    @callback
+    def async_enable_capture(self, recorder: FrameRecorder) -> CALLBACK_TYPE:
+        """Record every frame to and from the unit, returns a callback that stops it."""
+        self.device.recorder = recorder
+        if self.device.key is not None:
+            recorder.record_key(self.device.id, self.device.key)
+
+        async def _async_flush(now: datetime) -> None:
+            await recorder.async_flush()
+
+        unsub = async_track_time_interval(
+            self.hass, _async_flush, CAPTURE_FLUSH_INTERVAL,
+            name=f"electrolux_climate capture {self.device.mac.hex()}", cancel_on_shutdown=True)
+
+        @callback
+        def _async_disable() -> None:
+            unsub()
+            if self.device.recorder is recorder:
+                self.device.recorder = None
+            self.hass.async_create_task(recorder.async_flush())
+
+        return _async_disable
+
+    @callback
+    def _async_keepalive(self, now: datetime) -> None:
+        # Before the first request there is no socket yet, the next poll opens it.
+        if self.device.protocol is not None:
+            self.device.protocol.send(PING_FRAME, self.device.host)
+
+    @callback
+    def _async_unsolicited(self, data: bytes, addr: t.Tuple[str, int]) -> None:
+        if self.device.recorder is not None and addr[0] == self.device.host[0]:
+            self.device.recorder.record(RX, data)
+        if self._push_listener is None or not self.authenticated or addr[0] != self.device.host[0]:
+            _LOGGER.debug("Dropping unsolicited frame from %s", addr)
+            return
+
+        if len(data) < 0x28 or frame_type(data) != COMMAND_REPLY:
+            _LOGGER.debug("Ignoring unsolicited non-command frame from %s", addr)
+            return
+
+        try:
+            self._push_codec.check_frame(data)
+            body = self._push_codec.decrypt_frame(data, self.device.aes)
+            command = command_id(body)
+            values = json.loads(bytes(self._push_codec.unpack_command(body)))
+        except (BroadlinkException, ValueError) as err:
+            _LOGGER.debug("Ignoring unsolicited frame from %s: %s", addr, err)
+            return
+        if command != STATUS_COMMAND or not isinstance(values, dict):
+            _LOGGER.debug("Ignoring unsolicited command %#x from %s", command, addr)
+            return
+
+        self.metrics.pushes += 1
+        self._push_listener(values)
+
+    async def _async_auth(self) -> None:
+        self.authenticated = self._restored_auth = False
+        self.metrics.auths += 1
+        try:
+            await self.device.async_auth()
+        except Exception:
+            self.metrics.auth_failures += 1
+            raise
+        self.authenticated = True
+        if self.auth_listener is not None:
+            self.auth_listener(self.device.id, self.device.key)
+
+    @callback
+    def async_close(self) -> None:
+        """Close the transport of the session."""
+        self.commands.async_cancel()
+        if self._status_task is not None:
+            self._status_task.cancel()
+            self._status_task = None
+        if self._unlisten is not None:
+            self._unlisten()
+            self._unlisten = None
+        # The endpoint is shared, the registry closes it with the last session.
+        self.device.protocol = None
+        self.authenticated = False
+
+
+class SessionRegistry:
+    """Keeps one session per unit MAC address, shared by every platform."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        self._sessions: dict[str, ElectroluxSession] = {}
+
+    @callback
+    def async_get(self, host: str, mac: bytes, name: str = "", timeout: int = DEFAULT_TIMEOUT) -> ElectroluxSession:
+        """Return the session for mac, creating it on first use."""
+        session = self._sessions.get(mac.hex())
+        if session is None:
+            device = electrolux((host, DEFAULT_PORT), mac, DEVICE_TYPE, timeout, name, "", "Electrolux", False)
+            session = self._sessions[mac.hex()] = ElectroluxSession(self.hass, device)
+        return session
+
+    @callback
+    def async_release(self, mac: bytes) -> None:
+        """Close and drop the session for mac."""
+        session = self._sessions.pop(mac.hex(), None)
+        if session is not None:
+            session.async_close()
+        if not self._sessions:
+            async_close_transport(self.hass)
+
+
+@callback
+def async_get_registry(hass: HomeAssistant) -> SessionRegistry:
+    """Return the integration wide session registry."""
+    if DATA_SESSIONS not in hass.data:
+        hass.data[DATA_SESSIONS] = SessionRegistry(hass)
+    return hass.data[DATA_SESSIONS]
@@ -0,0 +1,231 @@
+"""Asyncio UDP transport for the Electrolux Climate integration."""
+import asyncio
+import collections
+import contextlib
+import ipaddress
+import logging
+import socket
+import typing as t
+
+from functools import partial
+
+from homeassistant.core import HomeAssistant, callback
+
+from broadlink import DEFAULT_PORT
+from broadlink.const import DEFAULT_RETRY_INTVL
+from broadlink.exceptions import BroadlinkException, NetworkTimeoutError
+
+from .codec import frame_count, pack_hello, unpack_hello
+from .const import DATA_TRANSPORT
+
+if t.TYPE_CHECKING:
+    from .metrics import UnitMetrics
+
+_LOGGER = logging.getLogger(__name__)
+
+
+Address = t.Tuple[str, int]
+Listener = t.Callable[[bytes, Address], None]
+# Requests remembered after they finished, so late copies of their replies
+# are not taken for frames a unit sent on its own.
+RECENT_REQUESTS = 1024
+
+# Host, device type, name and lock flag of a unit that answered a hello.
+HelloReply = t.Tuple[str, int, str, bool]
+
+
+class ElectroluxProtocol(asyncio.DatagramProtocol):
+    """Sends framed packets on the event loop and matches replies by address and packet counter.
+
+    One endpoint serves every unit. Hosts have to be given as resolved
+    addresses, replies are matched against the address they come from.
+    """
+
+    def __init__(self) -> None:
+        self.transport: t.Optional[asyncio.DatagramTransport] = None
+        self._pending: dict[t.Tuple[Address, int], asyncio.Future] = {}
+        self._finished: collections.OrderedDict[t.Tuple[Address, int], None] = collections.OrderedDict()
+        # Called with frames from a host that no request is waiting for.
+        self._listeners: dict[str, list[Listener]] = {}
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        self.transport = transport
+
+    def connection_lost(self, exc: t.Optional[Exception]) -> None:
+        self.transport = None
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(exc or ConnectionError("Transport closed"))
+        self._pending.clear()
+
+    def error_received(self, exc: Exception) -> None:
+        # ICMP errors are not tied to a request, let the pending ones time out.
+        _LOGGER.debug("Transport error: %s", exc)
+
+    def datagram_received(self, data: bytes, addr: t.Tuple[str, int]) -> None:
+        if len(data) < 0x2A:
+            _LOGGER.debug("Dropping truncated frame from %s", addr)
+            return
+
+        count = frame_count(data)
+        future = self._pending.get((addr[:2], count))
+        if future is None and (addr[:2], count) in self._finished:
+            # A reply to a copy the request was resent as, after the first one.
+            _LOGGER.debug("Dropping late reply from %s (count %04x)", addr, count)
+            return
+        if future is None or future.done():
+            listeners = self._listeners.get(addr[0])
+            if not listeners:
+                _LOGGER.debug("Dropping unsolicited frame from %s (count %04x)", addr, count)
+            for listener in listeners or ():
+                listener(data, addr)
+            return
+        future.set_result(data)
+
+    @callback
+    def async_listen(self, host: str, listener: Listener) -> t.Callable[[], None]:
+        """Pass unsolicited frames from host to listener, returns a callback that stops it."""
+        self._listeners.setdefault(host, []).append(listener)
+
+        @callback
+        def _async_unlisten() -> None:
+            listeners = self._listeners.get(host, [])
+            if listener in listeners:
+                listeners.remove(listener)
+            if not listeners:
+                self._listeners.pop(host, None)
+
+        return _async_unlisten
+
+    async def async_request(self, packet: t.Union[bytes, memoryview], host: t.Tuple[str, int], count: int, timeouts: t.Sequence[float], metrics: t.Optional["UnitMetrics"] = None) -> bytes:
+        """Send packet to host and wait for the reply carrying the same counter.
+
+        The same packet is sent once for every entry of timeouts, waiting
+        that long for a reply before sending it again. A reply to any of
+        the copies completes the request.
+        """
+        if self.transport is None:
+            raise ConnectionError("Transport closed")
+
+        key = (tuple(host), count)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[key] = future
+
+        try:
+            for attempt, timeout in enumerate(timeouts):
+                if attempt and metrics is not None:
+                    metrics.retransmits += 1
+                self.transport.sendto(packet, host)
+                done, _ = await asyncio.wait({future}, timeout=timeout)
+                if done:
+                    return future.result()
+            raise NetworkTimeoutError(
+                -4000,
+                "Network timeout",
+                f"No response received within {sum(timeouts):.1f}s",
+            )
+        finally:
+            self._pending.pop(key, None)
+            self._finished[key] = None
+            self._finished.move_to_end(key)
+            if len(self._finished) > RECENT_REQUESTS:
+                self._finished.popitem(last=False)
+
+    def send(self, packet: bytes, host: t.Tuple[str, int]) -> None:
+        """Send a packet that expects no reply."""
+        if self.transport is not None:
+            self.transport.sendto(packet, host)
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
+
+
+class _HelloProtocol(asyncio.DatagramProtocol):
+    """Collects hello replies from any address."""
+
+    def __init__(self, mac: t.Optional[bytes] = None) -> None:
+        self.transport: t.Optional[asyncio.DatagramTransport] = None
+        self.replies: t.Dict[bytes, HelloReply] = {}
+        self.mac = mac
+        # Set once the unit with mac answered.
+        self.found = asyncio.Event()
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        self.transport = transport
+
+    def error_received(self, exc: Exception) -> None:
+        # Unreachable hosts in a sweep are expected.
+        _LOGGER.debug("Hello transport error: %s", exc)
+
+    def datagram_received(self, data: bytes, addr: t.Tuple[str, int]) -> None:
+        try:
+            devtype, mac, name, is_locked = unpack_hello(data)
+        except BroadlinkException:
+            _LOGGER.debug("Ignoring a short hello reply from %s", addr)
+            return
+        self.replies.setdefault(mac, (addr[0], devtype, name, is_locked))
+        if mac == self.mac:
+            self.found.set()
+
+
+async def async_hello(addresses: t.Iterable[str], timeout: float, port: int = DEFAULT_PORT, mac: t.Optional[bytes] = None) -> t.Dict[bytes, HelloReply]:
+    """Send a hello to every address at once and return the replies by MAC.
+
+    Hellos are repeated every DEFAULT_RETRY_INTVL until timeout, to make up
+    for lost packets. With mac given, returns as soon as that unit answered.
+    """
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        partial(_HelloProtocol, mac), local_addr=("0.0.0.0", 0), allow_broadcast=True)
+
+    packet = pack_hello()
+    addresses = list(addresses)
+    try:
+        deadline = loop.time() + timeout
+        while loop.time() < deadline and not protocol.found.is_set():
+            for address in addresses:
+                transport.sendto(packet, (address, port))
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(protocol.found.wait(), min(DEFAULT_RETRY_INTVL, max(deadline - loop.time(), 0)))
+    finally:
+        transport.close()
+    return protocol.replies
+
+
+async def async_create_protocol() -> ElectroluxProtocol:
+    """Open a UDP endpoint for talking to units."""
+    loop = asyncio.get_running_loop()
+    _, protocol = await loop.create_datagram_endpoint(ElectroluxProtocol, local_addr=("0.0.0.0", 0))
+    return protocol
+
+
+async def async_get_transport(hass: HomeAssistant) -> ElectroluxProtocol:
+    """Return the integration wide UDP endpoint, opening it on first use."""
+    task = hass.data.get(DATA_TRANSPORT)
+    if task is None or (task.done() and (task.cancelled() or task.exception() or task.result().transport is None)):
+        task = hass.data[DATA_TRANSPORT] = hass.async_create_task(async_create_protocol())
+    return await asyncio.shield(task)
+
+
+@callback
+def async_close_transport(hass: HomeAssistant) -> None:
+    """Close the integration wide UDP endpoint, if it is open."""
+    task = hass.data.pop(DATA_TRANSPORT, None)
+    if task is None:
+        return
+    if not task.done():
+        task.add_done_callback(lambda task: task.cancelled() or task.exception() or task.result().close())
+    elif not task.cancelled() and not task.exception():
+        task.result().close()
+
+
+async def async_resolve(host: Address) -> Address:
+    """Return host with its name resolved to an IPv4 address."""
+    try:
+        ipaddress.ip_address(host[0])
+    except ValueError:
+        infos = await asyncio.get_running_loop().getaddrinfo(host[0], host[1], family=socket.AF_INET, type=socket.SOCK_DGRAM)
+        return infos[0][4][:2]
+    return tuple(host[:2])
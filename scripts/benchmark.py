@@ -0,0 +1,350 @@
+"""Benchmark suite for the Electrolux Climate protocol hot path.
+
+Covers frame encoding and decoding (against the previous bytearray based
+framing), status parsing and the entity mapping, and a full poll cycle
+over many units served by scripts/simulator.py. Every benchmark reports
+ops/sec, p50/p99 latency and the peak memory allocated per call.
+
+Run from the repository root in a Home Assistant development environment:
+
+    python scripts/benchmark.py --json before.json
+    python scripts/benchmark.py --compare before.json
+
+--compare exits non-zero when a benchmark's median latency got worse
+than --threshold; the median is used as it is far less sensitive to
+scheduler noise than the mean behind ops/sec.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import struct
+import subprocess
+import sys
+import time
+import tracemalloc
+import typing as t
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes  # noqa: E402
+
+from custom_components.electrolux_climate.climate import ElectroluxClimateEntity  # noqa: E402
+from custom_components.electrolux_climate.codec import PacketCodec  # noqa: E402
+from custom_components.electrolux_climate.electrolux import electrolux, DEVICE_TYPE, ElectroluxStatus  # noqa: E402
+from custom_components.electrolux_climate.switch import ElectroluxClimateLedEntity  # noqa: E402
+from custom_components.electrolux_climate.transport import async_create_protocol  # noqa: E402
+
+import simulator  # noqa: E402
+
+KEY = bytes.fromhex("097628343fe99e23765c1513accf8b02")
+IV = bytes.fromhex("562e17996d093d28ddb3ba695a2e6f58")
+MAC = bytes.fromhex("34ea34000001")
+
+STATUS = {
+    "envtemp": 23, "temp": 24, "ac_pwr": 1, "ac_mode": 1, "ac_mark": 2, "ac_vdir": 0,
+    "ac_hdir": 0, "scrdisp": 1, "ac_slp": 0, "mldprf": 0, "ac_heaterassist": 0,
+    "ac_health": 0, "ac_clean": 0, "ac_mute": 0, "ac_tempunit": 1, "ac_astheat": 0,
+    "qtmode": 0, "timer": "0000|00", "sn": "ELX0123456789ABCDEF",
+}
+
+
+def legacy_pack(command: int, data: bytes) -> bytearray:
+    packet = bytearray(0xD)
+    packet[0x00:0x02] = command.to_bytes(2, "little")
+    packet[0x02:0x06] = bytes.fromhex("a5a55a5a")
+    packet[0x08] = 0x01 if len(data) <= 2 else 0x02
+    packet[0x09] = 0x0b
+    packet[0xA:0xB] = len(data).to_bytes(2, "little")
+    packet.extend(data)
+    d_checksum = sum(packet[0x08:], 0xC0AD) & 0xFFFF
+    packet[0x06:0x08] = d_checksum.to_bytes(2, "little")
+    return packet
+
+
+def legacy_frame(cipher: Cipher, packet_type: int, payload: bytes, count: int = 0x8001) -> bytes:
+    packet = bytearray(0x38)
+    packet[0x00:0x08] = bytes.fromhex("5aa5aa555aa5aa55")
+    packet[0x24:0x26] = DEVICE_TYPE.to_bytes(2, "little")
+    packet[0x26:0x28] = packet_type.to_bytes(2, "little")
+    packet[0x28:0x2A] = count.to_bytes(2, "little")
+    packet[0x2A:0x30] = MAC[::-1]
+    packet[0x30:0x34] = (1).to_bytes(4, "little")
+    p_checksum = sum(payload, 0xBEAF) & 0xFFFF
+    packet[0x34:0x36] = p_checksum.to_bytes(2, "little")
+    padding = (16 - len(payload)) % 16
+    encryptor = cipher.encryptor()
+    packet.extend(encryptor.update(bytes(payload) + bytes(padding)) + encryptor.finalize())
+    checksum = sum(packet, 0xBEAF) & 0xFFFF
+    packet[0x20:0x22] = checksum.to_bytes(2, "little")
+    return bytes(packet)
+
+
+def legacy_unpack(cipher: Cipher, resp: bytes) -> bytes:
+    nom_checksum = int.from_bytes(resp[0x20:0x22], "little")
+    real_checksum = sum(resp, 0xBEAF) - sum(resp[0x20:0x22]) & 0xFFFF
+    if nom_checksum != real_checksum:
+        raise ValueError("frame checksum")
+    if struct.unpack("h", resp[0x22:0x24])[0]:
+        raise ValueError("error code")
+    decryptor = cipher.decryptor()
+    dcry = decryptor.update(bytes(resp[0x38:])) + decryptor.finalize()
+    r_checksum = sum(dcry[0x08:], 0xC0AD) & 0xFFFF
+    if r_checksum != struct.unpack("H", dcry[0x06:0x08])[0]:
+        raise ValueError("payload checksum")
+    r_length = struct.unpack("h", dcry[0xA:0xC])[0]
+    return dcry[0xE:0xE + r_length]
+
+
+def status_response(cipher: Cipher) -> bytes:
+    """Build a status reply the way a unit would."""
+    data = json.dumps(STATUS).encode("ascii")
+    payload = legacy_pack(0x0e, data)
+    payload.extend(bytes((16 - len(payload)) % 16))
+    return legacy_frame(cipher, 0x3ee, payload)
+
+
+def allocated(func, calls: int = 20) -> float:
+    """Return the mean peak bytes allocated by one call of func."""
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            func()
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+    return statistics.fmean(peaks)
+
+
+def report(result: dict) -> dict:
+    print("%-36s %12.0f ops/s   p50 %9.2f us   p99 %9.2f us   alloc %8s" % (
+        result["name"], result["ops_per_sec"], result["p50_us"], result["p99_us"],
+        "-" if result["alloc_bytes"] is None else "%.0f B" % result["alloc_bytes"]))
+    return result
+
+
+def summarize(name: str, samples: list, alloc_bytes: t.Optional[float] = None, ops: t.Optional[float] = None) -> dict:
+    """Build a result from latency samples in nanoseconds."""
+    samples = sorted(samples)
+    return report({
+        "name": name,
+        "ops_per_sec": ops if ops is not None else 1e9 / statistics.fmean(samples),
+        "p50_us": samples[len(samples) // 2] / 1000,
+        "p99_us": samples[min(int(len(samples) * 0.99), len(samples) - 1)] / 1000,
+        "alloc_bytes": alloc_bytes,
+    })
+
+
+def bench(name: str, func, number: int) -> dict:
+    """Time number calls of func and return ops/sec, latency percentiles and allocations."""
+    for _ in range(min(number, 1000)):
+        func()
+
+    samples = []
+    clock = time.perf_counter_ns
+    for _ in range(number):
+        start = clock()
+        func()
+        samples.append(clock() - start)
+
+    return summarize(name, samples, allocated(func))
+
+
+def codec_benchmarks(number: int) -> list[dict]:
+    cipher = Cipher(algorithms.AES(KEY), modes.CBC(IV))
+    codec = PacketCodec()
+    request = b"{}"
+    command = b'{"ac_mode":1,"ac_mark":2,"ac_vdir":1}'
+    resp = status_response(cipher)
+
+    assert bytes(legacy_unpack(cipher, resp)) == bytes(codec.unpack_command(codec.decrypt_frame(resp, cipher)))
+    assert legacy_frame(cipher, 0x6A, legacy_pack(0x19, command)) == bytes(
+        codec.pack_frame(0x6A, codec.pack_command(0x19, command), DEVICE_TYPE, 0x8001, MAC, 1, cipher))
+
+    def legacy_encode(data):
+        return lambda: legacy_frame(cipher, 0x6A, legacy_pack(0x0e, data))
+
+    def codec_encode(data):
+        return lambda: codec.pack_frame(0x6A, codec.pack_command(0x0e, data), DEVICE_TYPE, 0x8001, MAC, 1, cipher)
+
+    def codec_decode():
+        codec.check_frame(resp)
+        return codec.unpack_command(codec.decrypt_frame(resp, cipher))
+
+    return [
+        bench("encode status request (legacy)", legacy_encode(request), number),
+        bench("encode status request (codec)", codec_encode(request), number),
+        bench("encode command (legacy)", legacy_encode(command), number),
+        bench("encode command (codec)", codec_encode(command), number),
+        bench("decode status reply (legacy)", lambda: legacy_unpack(cipher, resp), number),
+        bench("decode status reply (codec)", codec_decode, number),
+    ]
+
+
+def status_benchmarks(number: int) -> list[dict]:
+    data = memoryview(json.dumps(STATUS).encode("ascii"))
+
+    # Previously the climate and LED entities each decoded the reply.
+    def legacy_parse():
+        state = json.loads(str(data, "ascii"))
+        climate = state["envtemp"], state["temp"], state["ac_pwr"], state["ac_mode"], state["ac_mark"], state["ac_vdir"]
+        state = json.loads(str(data, "ascii"))
+        return climate, state["scrdisp"]
+
+    def model_parse():
+        state = ElectroluxStatus.from_json(data)
+        climate = state.envtemp, state.temp, state.ac_pwr, state.ac_mode, state.ac_mark, state.ac_vdir
+        return climate, state.scrdisp
+
+    return [
+        bench("parse status per entity (dict)", legacy_parse, number),
+        bench("parse status once (model)", model_parse, number),
+    ]
+
+
+def entity_benchmarks(number: int) -> list[dict]:
+    # Only the mapping is measured, so the entities are built without Home Assistant.
+    climate = ElectroluxClimateEntity.__new__(ElectroluxClimateEntity)
+    led = ElectroluxClimateLedEntity.__new__(ElectroluxClimateLedEntity)
+    climate.sn = led.sn = STATUS["sn"]
+
+    states = [ElectroluxStatus.from_dict(STATUS), ElectroluxStatus.from_dict({**STATUS, "envtemp": 22})]
+    index = 0
+
+    def update():
+        nonlocal index
+        old, new = states[index], states[index ^ 1]
+        index ^= 1
+        changed = new.diff(old)
+        for entity in (climate, led):
+            if changed & entity._status_fields:
+                entity._update_from_status(new)
+
+    def unchanged():
+        changed = states[0].diff(states[0])
+        for entity in (climate, led):
+            if changed & entity._status_fields:
+                entity._update_from_status(states[0])
+
+    return [
+        bench("entity update (changed)", update, number),
+        bench("entity update (unchanged)", unchanged, number),
+    ]
+
+
+async def async_poll_benchmark(units: int, cycles: int, concurrency: int, latency: float) -> list[dict]:
+    """Poll every simulated unit once per cycle, like the PollScheduler does."""
+    sims = await simulator.async_start_units(
+        units, port=42000, profile=simulator.Profile(latency=latency, jitter=latency / 2))
+    # Every unit shares one endpoint, like the integration's sessions do.
+    protocol = await async_create_protocol()
+    devices = []
+    try:
+        for sim in sims:
+            device = electrolux(sim.address, sim.mac, DEVICE_TYPE, 5)
+            device.protocol = protocol
+            devices.append(device)
+        await asyncio.gather(*(device.async_auth() for device in devices))
+
+        semaphore = asyncio.Semaphore(concurrency)
+        requests = []
+        clock = time.perf_counter_ns
+
+        async def poll(device):
+            async with semaphore:
+                start = clock()
+                await device.async_get_status()
+                requests.append(clock() - start)
+
+        cycle_samples = []
+        for _ in range(cycles):
+            start = clock()
+            await asyncio.gather(*(poll(device) for device in devices))
+            cycle_samples.append(clock() - start)
+    finally:
+        protocol.close()
+        for sim in sims:
+            sim.close()
+
+    polled = units * cycles * 1e9 / sum(cycle_samples)
+    return [
+        summarize("poll cycle (%s units)" % units, cycle_samples, ops=polled),
+        summarize("poll request (%s units)" % units, requests),
+    ]
+
+
+SUITES = {
+    "codec": codec_benchmarks,
+    "status": status_benchmarks,
+    "entity": entity_benchmarks,
+}
+
+
+def compare(results: list[dict], baseline_path: str, threshold: float) -> bool:
+    """Print the change against a saved run, return False if anything regressed."""
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = {result["name"]: result for result in json.load(file)["results"]}
+
+    print("\nCompared with %s:" % baseline_path)
+    ok = True
+    for result in results:
+        before = baseline.get(result["name"])
+        if before is None:
+            continue
+        change = result["p50_us"] / before["p50_us"] - 1
+        regressed = change > threshold
+        ok = ok and not regressed
+        print("%-36s p50 %+7.1f%%   p99 %9.2f -> %9.2f us%s" % (
+            result["name"], change * 100, before["p99_us"], result["p99_us"], "   REGRESSION" if regressed else ""))
+    return ok
+
+
+def revision() -> t.Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=20000, help="calls per benchmark")
+    parser.add_argument("--suite", nargs="+", choices=[*SUITES, "poll"], default=[*SUITES, "poll"], help="benchmarks to run")
+    parser.add_argument("--units", type=int, default=100, help="simulated units in the poll benchmark")
+    parser.add_argument("--cycles", type=int, default=20, help="poll cycles to run")
+    parser.add_argument("--concurrency", type=int, default=10, help="polls in flight at once")
+    parser.add_argument("--latency", type=float, default=0.005, help="simulated network latency in seconds")
+    parser.add_argument("--json", metavar="PATH", help="save the results for a later --compare")
+    parser.add_argument("--compare", metavar="PATH", help="compare against results saved with --json")
+    parser.add_argument("--threshold", type=float, default=0.1, help="slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    results = []
+    for suite in args.suite:
+        if suite == "poll":
+            results.extend(asyncio.run(async_poll_benchmark(args.units, args.cycles, args.concurrency, args.latency)))
+        else:
+            results.extend(SUITES[suite](args.number))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({
+                "revision": revision(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            }, file, indent=2)
+
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Replay frame captures through the integration's decoding path.
+
+Captures are recorded by the "Record frames for replay" option of a unit
+and saved as .elxcap files in the electrolux_climate folder of the Home
+Assistant configuration directory. Every received frame is fed through
+the device's codec, the status model and the entity mapping, the same
+path a poll takes, so real traffic from odd firmwares becomes a
+benchmark and a regression test that need no hardware.
+
+Run from the repository root in a Home Assistant development environment:
+
+    python scripts/replay.py capture.elxcap --json before.json
+    python scripts/replay.py capture.elxcap --compare before.json
+    python scripts/replay.py capture.elxcap --realtime
+
+By default frames are replayed as fast as possible, --repeat times over
+for steadier numbers. --realtime keeps the recorded gaps between frames
+instead. Results can be saved and compared like scripts/benchmark.py.
+"""
+import argparse
+import collections
+import json
+import os
+import platform
+import struct
+import sys
+import time
+import typing as t
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from broadlink.exceptions import BroadlinkException  # noqa: E402
+
+from custom_components.electrolux_climate.capture import KEY, KEY_RECORD, TX, read_capture  # noqa: E402
+from custom_components.electrolux_climate.climate import ElectroluxClimateEntity  # noqa: E402
+from custom_components.electrolux_climate.electrolux import electrolux, DEVICE_TYPE, ElectroluxStatus, STATUS_FIELDS  # noqa: E402
+from custom_components.electrolux_climate.number import ElectroluxTimerEntity, TIMERS  # noqa: E402
+from custom_components.electrolux_climate.switch import ElectroluxClimateLedEntity, ElectroluxSwitchEntity, SWITCHES  # noqa: E402
+
+from benchmark import compare, revision, summarize  # noqa: E402
+
+AUTH = 0x65
+AUTH_REPLY = 0x3E9
+COMMAND_REPLY = 0x3EE
+
+
+def entities() -> list:
+    """Return every entity of a unit, built without Home Assistant."""
+    built = [ElectroluxClimateEntity.__new__(ElectroluxClimateEntity), ElectroluxClimateLedEntity.__new__(ElectroluxClimateLedEntity)]
+    for cls, descriptions in ((ElectroluxSwitchEntity, SWITCHES), (ElectroluxTimerEntity, TIMERS)):
+        for description in descriptions:
+            entity = cls.__new__(cls)
+            entity.entity_description = description
+            if cls is ElectroluxSwitchEntity:
+                entity._status_fields = frozenset({"sn", description.field})
+            built.append(entity)
+    for entity in built:
+        entity.sn = None
+    return built
+
+
+def replay(path: str, realtime: bool, counts: collections.Counter, samples: list) -> None:
+    """Replay one capture, counting what was seen and timing every received frame."""
+    mac, _, records = read_capture(path)
+    device = electrolux(("0.0.0.0", 80), mac, DEVICE_TYPE, 1)
+    init_key = bytes.fromhex(device._Device__INIT_KEY)
+    units = entities()
+    previous: t.Optional[ElectroluxStatus] = None
+
+    clock = time.perf_counter_ns
+    started = time.monotonic()
+    for seconds, kind, data in records:
+        if realtime:
+            time.sleep(max(0.0, started + seconds - time.monotonic()))
+
+        if kind == KEY:
+            device.restore_auth(*KEY_RECORD.unpack(data))
+            continue
+
+        packet_type = struct.unpack_from("<H", data, 0x26)[0] if len(data) >= 0x28 else None
+        if kind == TX:
+            counts["sent"] += 1
+            if packet_type == AUTH:
+                # The auth reply is encrypted with the initial key.
+                device.update_aes(init_key)
+            continue
+
+        counts["received"] += 1
+        if packet_type != COMMAND_REPLY:
+            counts["auth replies" if packet_type == AUTH_REPLY else "other"] += 1
+            continue
+
+        start = clock()
+        try:
+            state = ElectroluxStatus.from_json(device._unpack(data))
+        except BroadlinkException as err:
+            counts[f"rejected ({type(err).__name__})"] += 1
+            continue
+        except ValueError:
+            counts["unparsable"] += 1
+            continue
+
+        changed = state.diff(previous) if previous is not None else STATUS_FIELDS
+        previous = state
+        for entity in units:
+            if entity.sn is None:
+                entity.sn = state.sn
+            if changed & entity._status_fields:
+                entity._update_from_status(state)
+        samples.append(clock() - start)
+
+        counts["statuses"] += 1
+        counts["without sn"] += state.sn is None
+        counts["changed"] += bool(changed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("captures", nargs="+", metavar="CAPTURE", help="capture files to replay")
+    parser.add_argument("--realtime", action="store_true", help="keep the recorded timing between frames")
+    parser.add_argument("--repeat", type=int, default=10, help="times to replay the captures at full speed")
+    parser.add_argument("--json", metavar="PATH", help="save the results for a later --compare")
+    parser.add_argument("--compare", metavar="PATH", help="compare against results saved with --json")
+    parser.add_argument("--threshold", type=float, default=0.1, help="slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    results = []
+    for path in args.captures:
+        counts: collections.Counter = collections.Counter()
+        samples: list = []
+        started = time.perf_counter()
+        for repeat in range(1 if args.realtime else args.repeat):
+            # Frames are only counted once, however often they are replayed.
+            replay(path, args.realtime, collections.Counter() if repeat else counts, samples)
+        elapsed = time.perf_counter() - started
+
+        print("%s: %s" % (os.path.basename(path), ", ".join("%s %d" % item for item in sorted(counts.items()))))
+        if not samples:
+            print("  no status frames to time")
+            continue
+        # In real time the throughput would only measure the recorded gaps.
+        ops = None if args.realtime else len(samples) / elapsed
+        result = summarize("replay %s" % os.path.basename(path), samples, ops=ops)
+        result["counts"] = dict(counts)
+        results.append(result)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({
+                "revision": revision(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            }, file, indent=2)
+
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+"""Simulated Electrolux air conditioners for load and latency testing.
+
+Each simulated unit listens on its own UDP address and answers the
+broadlink hello, the auth handshake and 0x6A commands like a 0x4f9b unit,
+so the integration can be pointed at it without real hardware. Units keep
+a small thermal model of the room and can be made slow or lossy.
+
+    python scripts/simulator.py --units 100 --port 40000
+    python scripts/simulator.py --units 20 --addresses --port 80 --latency 0.05 --loss 0.02
+    python scripts/simulator.py --units 5 --addresses --port 80 --push
+
+Without --addresses units share 127.0.0.1 and use consecutive ports.
+With it every unit gets its own 127.0.0.x address on the same port; the
+integration always talks to port 80, so point it at units started with
+--addresses --port 80 (binding port 80 may need extra privileges).
+
+With --push units behave like firmware that reports changes on its own:
+every address that keeps sending broadlink pings gets an unsolicited
+status frame whenever the status changes, whoever changed it.
+
+Only depends on cryptography so it also checks the integration's framing
+against an independent implementation.
+"""
+import argparse
+import asyncio
+import ipaddress
+import json
+import logging
+import os
+import random
+import struct
+import typing as t
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+_LOGGER = logging.getLogger("simulator")
+
+DEVICE_TYPE = 0x4f9b
+INIT_KEY = bytes.fromhex("097628343fe99e23765c1513accf8b02")
+IV = bytes.fromhex("562e17996d093d28ddb3ba695a2e6f58")
+FRAME_MAGIC = bytes.fromhex("5aa5aa555aa5aa55")
+COMMAND_MAGIC = bytes.fromhex("a5a55a5a")
+
+HEADER = struct.Struct("<8s24xHhHHH6sIH2x")
+COMMAND = struct.Struct("<H4sHBBH2x")
+
+PING = 0x01
+HELLO = 0x06
+AUTH = 0x65
+COMMAND_PACKET = 0x6A
+AUTH_REPLY = 0x3E9
+COMMAND_REPLY = 0x3EE
+
+ERROR_AUTHORIZATION = -7
+
+STATUS_REQUEST = 0x0e
+COMMAND_KEYS = {
+    0x17: {"temp"},
+    0x18: {"ac_pwr", "ac_slp", "mldprf"},
+    0x19: {"ac_mode", "ac_mark", "ac_vdir", "scrdisp"},
+    0x1f: {"timer"},
+}
+
+# Seconds a pinging client stays subscribed to pushes, and how often
+# units with subscribers check their status for changes.
+SUBSCRIPTION_TIMEOUT = 60.0
+PUSH_CHECK = 1.0
+
+MODE_COOL, MODE_HEAT, MODE_DRY, MODE_FAN, MODE_AUTO, MODE_HEAT_8 = 0, 1, 2, 3, 4, 6
+
+
+def _checksum(data: t.Union[bytes, bytearray, memoryview], base: int) -> int:
+    return sum(data, base) & 0xFFFF
+
+
+def _count(frame: bytes) -> int:
+    return struct.unpack_from("<H", frame, 0x28)[0]
+
+
+def _aes(key: bytes) -> Cipher:
+    return Cipher(algorithms.AES(key), modes.CBC(IV))
+
+
+class Profile:
+    """Network behaviour of a simulated unit."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, loss: float = 0.0, slow_rate: float = 0.0, slow_delay: float = 2.0) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.slow_rate = slow_rate
+        self.slow_delay = slow_delay
+
+    def delay(self) -> t.Optional[float]:
+        """Return how long to wait before answering, None to drop the request."""
+        if self.loss and random.random() < self.loss:
+            return None
+        delay = self.latency + random.uniform(0, self.jitter)
+        if self.slow_rate and random.random() < self.slow_rate:
+            delay += self.slow_delay
+        return delay
+
+
+class AirConditioner:
+    """State machine of one unit.
+
+    The room drifts one degree towards its target every drift seconds:
+    towards the setpoint while cooling or heating, and back to ambient
+    while the unit is off or only moving air.
+    """
+
+    def __init__(self, sn: str, ambient: int = 26, drift: float = 30.0, clock: t.Callable[[], float] = None) -> None:
+        self.ambient = ambient
+        self.drift = drift
+        self._clock = clock or asyncio.get_running_loop().time
+        self._last_drift = self._clock()
+        self.status = {
+            "envtemp": ambient,
+            "temp": 24,
+            "ac_pwr": 0,
+            "ac_mode": MODE_COOL,
+            "ac_mark": 0,
+            "ac_vdir": 0,
+            "scrdisp": 1,
+            "ac_slp": 0,
+            "mldprf": 0,
+            "timer": "0000|00",
+            "sn": sn,
+        }
+
+    def _target(self) -> int:
+        status = self.status
+        if not status["ac_pwr"] or status["ac_mode"] == MODE_FAN:
+            return self.ambient
+        if status["ac_mode"] in (MODE_COOL, MODE_DRY):
+            return min(status["temp"], self.ambient)
+        if status["ac_mode"] in (MODE_HEAT, MODE_HEAT_8):
+            return max(status["temp"], self.ambient)
+        return status["temp"]
+
+    def tick(self) -> None:
+        """Apply the room drift for the time passed since the last tick."""
+        now = self._clock()
+        steps = int((now - self._last_drift) // self.drift)
+        if steps <= 0:
+            return
+        self._last_drift += steps * self.drift
+
+        target = self._target()
+        envtemp = self.status["envtemp"]
+        if envtemp < target:
+            self.status["envtemp"] = min(envtemp + steps, target)
+        elif envtemp > target:
+            self.status["envtemp"] = max(envtemp - steps, target)
+
+    def apply(self, command: int, values: dict) -> None:
+        """Apply the keys a command is allowed to change."""
+        allowed = COMMAND_KEYS.get(command, ())
+        for key, value in values.items():
+            if key in allowed:
+                self.status[key] = value
+            else:
+                _LOGGER.debug("Ignoring %s=%s in command %#x", key, value, command)
+
+    def to_json(self) -> bytes:
+        self.tick()
+        return json.dumps(self.status, separators=(",", ":")).encode("ascii")
+
+
+class SimulatedUnit(asyncio.DatagramProtocol):
+    """Answers the broadlink protocol for one AirConditioner."""
+
+    def __init__(self, mac: bytes, name: str, profile: Profile, ambient: int = 26, drift: float = 30.0, push: bool = False) -> None:
+        self.mac = mac
+        self.name = name
+        self.profile = profile
+        self.push = push
+        self.subscribers: t.Dict[t.Tuple[str, int], float] = {}
+        self._pushed: t.Optional[bytes] = None
+        self._push_count = 0
+        self._push_handle: t.Optional[asyncio.TimerHandle] = None
+        self.unit = AirConditioner("ELX" + mac.hex().upper(), ambient, drift)
+        self.transport: t.Optional[asyncio.DatagramTransport] = None
+        self.address: t.Optional[t.Tuple[str, int]] = None
+
+        self.dev_id = 0
+        self.key = INIT_KEY
+        self.reboot()
+        self.requests = 0
+        self.dropped = 0
+        self.auths = 0
+        self.pushes = 0
+
+    @property
+    def sn(self) -> str:
+        return self.unit.status["sn"]
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        self.transport = transport
+        self.address = transport.get_extra_info("sockname")
+
+    def datagram_received(self, data: bytes, addr: t.Tuple[str, int]) -> None:
+        self.requests += 1
+        delay = self.profile.delay()
+        if delay is None:
+            self.dropped += 1
+            return
+        if delay:
+            asyncio.get_running_loop().call_later(delay, self._answer, data, addr)
+        else:
+            self._answer(data, addr)
+
+    def _answer(self, data: bytes, addr: t.Tuple[str, int]) -> None:
+        if self.transport is None or len(data) < 0x30:
+            return
+        try:
+            reply = self.handle(data, addr)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("%s failed to handle a packet from %s", self.name, addr)
+            return
+        if reply is not None:
+            self.transport.sendto(reply, addr)
+
+    def handle(self, data: bytes, addr: t.Optional[t.Tuple[str, int]] = None) -> t.Optional[bytes]:
+        """Return the reply to one request frame."""
+        if data[0x26] == HELLO and len(data) == 0x30:
+            return self._hello()
+        if data[0x26] == PING and len(data) == 0x30:
+            if self.push and addr is not None:
+                self._subscribe(addr)
+            return None
+
+        frame = bytearray(data)
+        checksum = struct.unpack_from("<H", frame, 0x20)[0]
+        frame[0x20:0x22] = b"\x00\x00"
+        if _checksum(frame, 0xBEAF) != checksum:
+            _LOGGER.debug("%s dropping a frame with a bad checksum", self.name)
+            return None
+
+        _, _, _, _, packet_type, _, _, dev_id, _ = HEADER.unpack_from(data)
+        if packet_type == AUTH:
+            return self._auth(data)
+        if packet_type != COMMAND_PACKET:
+            return None
+        if dev_id != self.dev_id or not self.dev_id:
+            return self._frame(_count(data), COMMAND_REPLY, b"", ERROR_AUTHORIZATION)
+
+        decryptor = _aes(self.key).decryptor()
+        payload = decryptor.update(data[HEADER.size:]) + decryptor.finalize()
+        command, magic, checksum, _, _, length = COMMAND.unpack_from(payload)
+        if magic != COMMAND_MAGIC or _checksum(payload[0x08:], 0xC0AD) != checksum:
+            _LOGGER.debug("%s dropping a command with a bad checksum", self.name)
+            return None
+
+        body = payload[COMMAND.size:COMMAND.size + length]
+        if command != STATUS_REQUEST:
+            self.unit.apply(command, json.loads(body) if body else {})
+            self._push_change(exclude=addr)
+        return self._frame(_count(data), COMMAND_REPLY, self._command(command, self.unit.to_json()))
+
+    def _hello(self) -> bytes:
+        reply = bytearray(0x80)
+        reply[0x00:0x08] = FRAME_MAGIC
+        reply[0x26] = HELLO + 1
+        struct.pack_into("<H", reply, 0x34, DEVICE_TYPE)
+        reply[0x3A:0x40] = self.mac[::-1]
+        name = self.name.encode("utf-8")[:0x3E]
+        reply[0x40:0x40 + len(name)] = name
+        struct.pack_into("<H", reply, 0x20, _checksum(reply, 0xBEAF))
+        return bytes(reply)
+
+    def reboot(self) -> None:
+        """Forget the session, clients have to authenticate again."""
+        self.dev_id = 0
+        self._session = (random.randint(1, 0xFFFFFFFF), os.urandom(16))
+
+    def _auth(self, data: bytes) -> bytes:
+        # The session survives repeated handshakes, so a retransmitted
+        # auth does not invalidate the key handed out by the first one.
+        self.auths += 1
+        self.dev_id, key = self._session
+
+        body = struct.pack("<I", self.dev_id) + key + bytes(12)
+        reply = self._frame(_count(data), AUTH_REPLY, body, key=INIT_KEY)
+        self.key = key
+        return reply
+
+    def _subscribe(self, addr: t.Tuple[str, int]) -> None:
+        loop = asyncio.get_running_loop()
+        self.subscribers[addr] = loop.time()
+        if self._push_handle is None:
+            self._pushed = self.unit.to_json()
+            self._push_handle = loop.call_later(PUSH_CHECK, self._push_loop)
+
+    def _push_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        for addr, seen in list(self.subscribers.items()):
+            if loop.time() - seen > SUBSCRIPTION_TIMEOUT:
+                del self.subscribers[addr]
+        if not self.subscribers or self.transport is None:
+            self._push_handle = None
+            return
+
+        self._push_change()
+        self._push_handle = loop.call_later(PUSH_CHECK, self._push_loop)
+
+    def _push_change(self, exclude: t.Optional[t.Tuple[str, int]] = None) -> None:
+        """Send the status to every subscriber but exclude if it changed since the last push."""
+        if not self.subscribers or not self.dev_id:
+            return
+        data = self.unit.to_json()
+        if data == self._pushed:
+            return
+        self._pushed = data
+
+        payload = self._command(STATUS_REQUEST, data)
+        for addr in self.subscribers:
+            if addr == exclude or self.transport is None:
+                continue
+            # Clients count from 0x8000, our own counter stays below it.
+            self._push_count = self._push_count % 0x7FFF + 1
+            self.transport.sendto(self._frame(self._push_count, COMMAND_REPLY, payload), addr)
+            self.pushes += 1
+
+    @staticmethod
+    def _command(command: int, data: bytes) -> bytes:
+        payload = bytearray(COMMAND.size + len(data))
+        COMMAND.pack_into(payload, 0, command, COMMAND_MAGIC, 0, 0x02, 0x0b, len(data))
+        payload[COMMAND.size:] = data
+        payload.extend(bytes(-len(payload) % 16))
+        struct.pack_into("<H", payload, 0x06, _checksum(payload[0x08:], 0xC0AD))
+        return bytes(payload)
+
+    def _frame(self, count: int, packet_type: int, payload: bytes, error: int = 0, key: t.Optional[bytes] = None) -> bytes:
+        """Wrap payload in a frame carrying count, the request's counter for replies."""
+        if payload:
+            encryptor = _aes(key or self.key).encryptor()
+            payload = encryptor.update(payload) + encryptor.finalize()
+
+        reply = bytearray(HEADER.size)
+        HEADER.pack_into(
+            reply, 0, FRAME_MAGIC, 0, error, DEVICE_TYPE, packet_type, count,
+            self.mac[::-1], self.dev_id, _checksum(payload, 0xBEAF))
+        reply.extend(payload)
+        struct.pack_into("<H", reply, 0x20, _checksum(reply, 0xBEAF))
+        return bytes(reply)
+
+    def close(self) -> None:
+        if self._push_handle is not None:
+            self._push_handle.cancel()
+            self._push_handle = None
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+
+
+async def async_start_units(
+    count: int,
+    host: str = "127.0.0.1",
+    port: int = 40000,
+    addresses: bool = False,
+    profile: t.Optional[Profile] = None,
+    ambient: int = 26,
+    drift: float = 30.0,
+    push: bool = False,
+) -> t.List[SimulatedUnit]:
+    """Start count units, on consecutive ports or consecutive addresses."""
+    loop = asyncio.get_running_loop()
+    profile = profile or Profile()
+    base = ipaddress.ip_address(host)
+    units = []
+
+    for index in range(count):
+        address = (str(base + index), port) if addresses else (host, port + index)
+        mac = bytes.fromhex("34ea34") + (index + 1).to_bytes(3, "big")
+        _, unit = await loop.create_datagram_endpoint(
+            lambda mac=mac, index=index: SimulatedUnit(mac, f"Simulated AC {index + 1}", profile, ambient, drift, push),
+            local_addr=address)
+        units.append(unit)
+
+    return units
+
+
+async def _async_main(args: argparse.Namespace) -> None:
+    profile = Profile(args.latency, args.jitter, args.loss, args.slow_rate, args.slow_delay)
+    units = await async_start_units(args.units, args.host, args.port, args.addresses, profile, args.ambient, args.drift, args.push)
+
+    for unit in units:
+        print("%s:%s  mac %s  sn %s" % (*unit.address, unit.mac.hex(), unit.sn))
+    print("Simulating %s units, press Ctrl+C to stop" % len(units))
+
+    try:
+        while True:
+            await asyncio.sleep(args.report or 3600)
+            if args.report:
+                requests = sum(unit.requests for unit in units)
+                dropped = sum(unit.dropped for unit in units)
+                auths = sum(unit.auths for unit in units)
+                pushes = sum(unit.pushes for unit in units)
+                print("requests %s  dropped %s  auths %s  pushes %s" % (requests, dropped, auths, pushes))
+    finally:
+        for unit in units:
+            unit.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--units", type=int, default=1, help="number of units to simulate")
+    parser.add_argument("--host", default="127.0.0.1", help="address of the first unit")
+    parser.add_argument("--port", type=int, default=40000, help="port of the first unit")
+    parser.add_argument("--addresses", action="store_true", help="give every unit its own address on the same port")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before every reply")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra latency, up to this many seconds")
+    parser.add_argument("--loss", type=float, default=0.0, help="fraction of requests to drop")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of replies to delay by --slow-delay")
+    parser.add_argument("--slow-delay", type=float, default=2.0, help="extra seconds for slow replies")
+    parser.add_argument("--ambient", type=int, default=26, help="room temperature the units drift back to")
+    parser.add_argument("--drift", type=float, default=30.0, help="seconds per degree of room temperature change")
+    parser.add_argument("--push", action="store_true", help="push status changes to clients that send pings")
+    parser.add_argument("--report", type=float, default=0.0, help="print request counters every this many seconds")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+    try:
+        asyncio.run(_async_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()